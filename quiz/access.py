@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import UserProfile
+
+ACCESS_HOME = 1
+ACCESS_EVENT = 2
+ACCESS_QUIZ = 4
+
+# UserProfile flag name -> bit
+ACCESS_FLAGS = {
+    "access_home": ACCESS_HOME,
+    "access_event": ACCESS_EVENT,
+    "access_quiz": ACCESS_QUIZ,
+}
+
+ACCESS_CACHE_TIMEOUT = getattr(settings, "QUIZ_ACCESS_CACHE_TIMEOUT", 60 * 60)
+
+
+# Page permissions of one user, packed into a bitmask
+class Access:
+    def __init__(self, mask=0):
+        self.mask = mask
+
+    def has(self, permission):
+        return bool(self.mask & ACCESS_FLAGS[permission])
+
+    @property
+    def home(self):
+        return self.has("access_home")
+
+    @property
+    def event(self):
+        return self.has("access_event")
+
+    @property
+    def quiz(self):
+        return self.has("access_quiz")
+
+    @property
+    def any(self):
+        return self.mask != 0
+
+
+def access_cache_key(user_id):
+    return f"quiz:access:{user_id}"
+
+
+def profile_mask(access_home, access_event, access_quiz):
+    return (
+        (ACCESS_HOME if access_home else 0)
+        | (ACCESS_EVENT if access_event else 0)
+        | (ACCESS_QUIZ if access_quiz else 0)
+    )
+
+
+# Cached bitmask for a user; users without a profile get no access.
+def load_access(user):
+    if not user.is_authenticated:
+        return Access()
+
+    key = access_cache_key(user.pk)
+    mask = cache.get(key)
+    if mask is None:
+        flags = (
+            UserProfile.objects
+            .filter(user_id=user.pk)
+            .values_list("access_home", "access_event", "access_quiz")
+            .first()
+        )
+        mask = profile_mask(*flags) if flags else 0
+        cache.set(key, mask, ACCESS_CACHE_TIMEOUT)
+    return Access(mask)
+
+
+def invalidate_access(user_id):
+    cache.delete(access_cache_key(user_id))
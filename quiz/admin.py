@@ -1,5 +1,40 @@
 from django.contrib import admin
 from .models import Quiz, Question, Answer, UserSubmission, UserAnswer, Event
+from .pagination import EstimatedCountPaginator
+from .search import fts_enabled, fts_query, matching_ids
+
+# Quiz filter that lists only the most recent quizzes (plus the selected
+# one) instead of loading every quiz into the sidebar
+class QuizFilter(admin.SimpleListFilter):
+    title = "quiz"
+    parameter_name = "quiz"
+    quiz_path = "quiz"
+    limit = 20
+
+    def lookups(self, request, model_admin):
+        quizzes = list(Quiz.objects.order_by("-created_at").values_list("id", "title")[:self.limit])
+        selected = self.value()
+        if selected and selected.isdigit() and int(selected) not in {pk for pk, _ in quizzes}:
+            quizzes += list(Quiz.objects.filter(id=selected).values_list("id", "title"))
+        return [(str(pk), title) for pk, title in quizzes]
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().isdigit():
+            return queryset.filter(**{f"{self.quiz_path}_id": self.value()})
+        return queryset
+
+
+class QuestionQuizFilter(QuizFilter):
+    quiz_path = "question__quiz"
+
+# Changelist search through the FTS5 index instead of LIKE '%term%' scans
+class FullTextSearchMixin:
+    search_index = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not fts_enabled() or fts_query(search_term) is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(id__in=matching_ids(self.search_index, search_term)), False
 
 # INLINE CLASSES
 class AnswerInline(admin.TabularInline):
@@ -12,12 +47,13 @@ class AnswerInline(admin.TabularInline):
 class QuestionInline(admin.StackedInline):
     model = Question
     extra = 1
-    fields = ("text", "question_type")
+    fields = ("text", "question_type", "category")
     show_change_link = True
 
 # QUIZ ADMIN
 @admin.register(Quiz)
-class QuizAdmin(admin.ModelAdmin):
+class QuizAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_index = "quiz_search_quiz"
     list_display = ("title", "created_at", "updated_at")
     search_fields = ("title",)
     list_filter = ("created_at", "updated_at")
@@ -28,6 +64,10 @@ class QuizAdmin(admin.ModelAdmin):
         ("Quiz Information", {
             "fields": ("title", "description"),
         }),
+        ("Question Pool", {
+            "fields": ("pool_size", "pool_quotas"),
+            "description": 'Leave empty to serve every question. Quotas look like {"algebra": 3, "geometry": 2}.',
+        }),
         ("Timestamps", {
             "fields": ("created_at", "updated_at"),
             "classes": ("collapse",),
@@ -38,16 +78,18 @@ class QuizAdmin(admin.ModelAdmin):
 
 # QUESTION ADMIN
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
-    list_display = ("text", "quiz", "question_type", "created_at")
-    list_filter = ("quiz", "question_type", "created_at")
+class QuestionAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_index = "quiz_search_question"
+    list_display = ("text", "quiz", "question_type", "category", "created_at")
+    list_filter = (QuizFilter, "question_type", "category", "created_at")
+    list_select_related = ("quiz",)
     search_fields = ("text",)
     ordering = ("quiz",)
     inlines = [AnswerInline]
 
     fieldsets = (
         ("Question Details", {
-            "fields": ("quiz", "text", "question_type"),
+            "fields": ("quiz", "text", "question_type", "category"),
         }),
         ("Timestamps", {
             "fields": ("created_at",),
@@ -57,22 +99,36 @@ class QuestionAdmin(admin.ModelAdmin):
 
     readonly_fields = ("created_at",)
 
+    # Question.__str__ shows the quiz title: join it for the changelist and
+    # the autocomplete results of AnswerAdmin/UserAnswerAdmin
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("quiz")
+
 # ANSWER ADMIN
 @admin.register(Answer)
 class AnswerAdmin(admin.ModelAdmin):
     list_display = ("text", "question", "is_correct")
-    list_filter = ("is_correct", "question__quiz")
+    list_filter = ("is_correct", QuestionQuizFilter)
+    list_select_related = ("question__quiz",)
     search_fields = ("text",)
-    ordering = ("question",)
+    ordering = ("-id",)
+    autocomplete_fields = ("question",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
 # USER SUBMISSION ADMIN
 @admin.register(UserSubmission)
 class UserSubmissionAdmin(admin.ModelAdmin):
     list_display = ("user_name", "quiz", "score", "submitted_at")
-    list_filter = ("quiz", "submitted_at")
+    list_filter = (QuizFilter, "submitted_at")
+    list_select_related = ("quiz",)
+    raw_id_fields = ("quiz",)
     search_fields = ("user_name",)
-    ordering = ("-submitted_at",)
+    # Newest first by primary key: no sort over the whole table
+    ordering = ("-id",)
     readonly_fields = ("submitted_at", "score")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ("Submission Info", {
@@ -88,9 +144,14 @@ class UserSubmissionAdmin(admin.ModelAdmin):
 @admin.register(UserAnswer)
 class UserAnswerAdmin(admin.ModelAdmin):
     list_display = ("submission", "question", "is_correct")
-    list_filter = ("is_correct", "question__quiz")
+    list_filter = ("is_correct", QuestionQuizFilter)
+    list_select_related = ("submission__quiz", "question__quiz")
     search_fields = ("submission__user_name",)
-    ordering = ("submission",)
+    ordering = ("-id",)
+    raw_id_fields = ("submission",)
+    autocomplete_fields = ("question",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 # EVENTS ADMIN
 @admin.register(Event)
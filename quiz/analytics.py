@@ -0,0 +1,188 @@
+from collections import Counter
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ItemAnalysis, QuestionAnalysis, UserAnswer, UserSubmission
+
+ANALYSIS_CHUNK_SIZE = 2000
+# Submission ids are assigned before commit, so a lower id can commit after
+# a refresh. Submissions this recent are scanned again on the next refresh;
+# it must exceed the longest submission transaction.
+LATE_COMMIT_WINDOW = timedelta(seconds=getattr(settings, "QUIZ_ANALYSIS_LATE_COMMIT_WINDOW", 300))
+# Wrong answers kept per question; free-text questions can collect many
+DISTRACTOR_LIMIT = 20
+
+
+# Submissions of a quiz not folded in yet, as ascending chunks of
+# (id, submitted_at): everything above the high-water mark plus everything
+# made since state.rescan_from (the caller skips the ones already seen).
+def _submission_chunks(quiz_id, state, chunk_size):
+    pending = Q(id__gt=state.last_submission_id)
+    if state.rescan_from is not None:
+        pending |= Q(submitted_at__gte=state.rescan_from)
+    submissions = (
+        UserSubmission.objects.filter(pending, quiz_id=quiz_id).order_by("id").values_list("id", "submitted_at")
+    )
+    after_id = 0
+    while True:
+        chunk = list(submissions.filter(id__gt=after_id)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        after_id = chunk[-1][0]
+
+
+# Load one chunk of submissions as a submissions x questions matrix.
+# Returns (answered, correct) boolean/int8 matrices plus the wrong answers
+# counted per column as {column: Counter}. Answer texts stay Python strings:
+# a fixed-width array would be sized by the longest answer in the chunk.
+def _load_matrix(quiz_id, chunk, columns):
+    answers = (
+        UserAnswer.objects
+        .filter(submission__quiz_id=quiz_id, submission_id__gte=chunk[0], submission_id__lte=chunk[-1])
+        .values_list("submission_id", "question_id", "is_correct", "answer")
+    )
+    submission_ids, question_ids, flags, texts = [], [], [], []
+    for submission_id, question_id, is_correct, answer in answers.iterator(chunk_size=ANALYSIS_CHUNK_SIZE):
+        submission_ids.append(submission_id)
+        question_ids.append(question_id)
+        flags.append(is_correct)
+        texts.append(answer)
+
+    answered = np.zeros((len(chunk), len(columns)), dtype=bool)
+    correct = np.zeros((len(chunk), len(columns)), dtype=np.int8)
+    if not submission_ids or not len(columns):
+        return answered, correct, {}
+
+    # The id range can hold submissions left out of the chunk (already seen)
+    chunk = np.asarray(chunk, dtype=np.int64)
+    submission_ids = np.asarray(submission_ids, dtype=np.int64)
+    rows = np.minimum(np.searchsorted(chunk, submission_ids), len(chunk) - 1)
+    question_ids = np.asarray(question_ids, dtype=np.int64)
+    cols = np.minimum(np.searchsorted(columns, question_ids), len(columns) - 1)
+    known = (chunk[rows] == submission_ids) & (columns[cols] == question_ids)
+    flags = np.asarray(flags, dtype=bool)
+
+    answered[rows[known], cols[known]] = True
+    correct[rows[known], cols[known]] = flags[known]
+
+    distractors = {}
+    for i in np.flatnonzero(known & ~flags).tolist():
+        distractors.setdefault(int(cols[i]), Counter())[texts[i]] += 1
+    return answered, correct, distractors
+
+
+# Per-question additive sums for one matrix chunk: responses, correct count,
+# and the sums of total score, squared total score and total score of correct
+# responders (enough to get the item-total correlation later).
+def _chunk_sums(answered, correct):
+    totals = correct.sum(axis=1, dtype=np.int64)
+    answered = answered.astype(np.int64)
+    correct = correct.astype(np.int64)
+    return np.stack([
+        answered.sum(axis=0),
+        correct.sum(axis=0),
+        answered.T @ totals,
+        answered.T @ (totals * totals),
+        correct.T @ totals,
+    ])
+
+
+# Difficulty is the share of correct responses; discrimination is the
+# corrected item-total (point-biserial) correlation between answering the
+# item correctly and the score on the rest of the quiz.
+def _derive(sums):
+    n, c, st, st2, sxt = sums.astype(np.float64)
+    sy = st - c
+    sy2 = st2 - 2 * sxt + c
+    sxy = sxt - c
+    var_x = n * c - c * c
+    var_y = n * sy2 - sy * sy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        difficulty = np.where(n > 0, c / n, np.nan)
+        discrimination = np.where(
+            (n > 1) & (var_x > 0) & (var_y > 0),
+            (n * sxy - c * sy) / np.sqrt(var_x * var_y),
+            np.nan,
+        )
+    return difficulty, discrimination
+
+
+def _or_none(value):
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+# Fold submissions newer than the quiz's high-water mark into its
+# QuestionAnalysis rows (or recompute everything with full=True).
+def refresh_item_analysis(quiz, full=False, chunk_size=ANALYSIS_CHUNK_SIZE):
+    with transaction.atomic():
+        state, _ = ItemAnalysis.objects.select_for_update().get_or_create(quiz=quiz)
+        question_ids = list(quiz.questions.order_by("id").values_list("id", flat=True))
+        columns = np.asarray(question_ids, dtype=np.int64)
+
+        if full:
+            QuestionAnalysis.objects.filter(quiz=quiz).delete()
+            state.last_submission_id = 0
+            state.submissions_count = 0
+            state.rescan_from = None
+            state.recent_submission_ids = []
+        existing = {row.question_id: row for row in QuestionAnalysis.objects.filter(quiz=quiz)}
+
+        sums = np.zeros((5, len(columns)), dtype=np.int64)
+        distractors = []
+        for col, question_id in enumerate(question_ids):
+            row = existing.get(question_id)
+            if row is not None:
+                sums[:, col] = (row.responses, row.correct_count, row.total_sum,
+                                row.total_sq_sum, row.correct_total_sum)
+            distractors.append(Counter(row.distractors if row else {}))
+
+        processed = 0
+        rescan_from = timezone.now() - LATE_COMMIT_WINDOW
+        seen = set(state.recent_submission_ids)
+        recent = []
+        for chunk in _submission_chunks(quiz.id, state, chunk_size):
+            recent += [pk for pk, submitted_at in chunk if submitted_at >= rescan_from]
+            ids = [pk for pk, _ in chunk if pk not in seen]
+            if not ids:
+                continue
+            answered, correct, found = _load_matrix(quiz.id, ids, columns)
+            sums += _chunk_sums(answered, correct)
+            for col, counts in found.items():
+                distractors[col].update(counts)
+            state.last_submission_id = max(state.last_submission_id, ids[-1])
+            processed += len(ids)
+        state.rescan_from = rescan_from
+        state.recent_submission_ids = recent
+
+        if not processed and not full and len(existing) == len(question_ids):
+            state.save(update_fields=["rescan_from", "recent_submission_ids"])
+            return state
+
+        difficulty, discrimination = _derive(sums)
+        to_create, to_update = [], []
+        for col, question_id in enumerate(question_ids):
+            row = existing.get(question_id) or QuestionAnalysis(quiz=quiz, question_id=question_id)
+            (row.responses, row.correct_count, row.total_sum,
+             row.total_sq_sum, row.correct_total_sum) = sums[:, col].tolist()
+            row.distractors = dict(distractors[col].most_common(DISTRACTOR_LIMIT))
+            row.difficulty = _or_none(difficulty[col])
+            row.discrimination = _or_none(discrimination[col])
+            (to_update if row.pk else to_create).append(row)
+
+        QuestionAnalysis.objects.bulk_create(to_create, batch_size=500)
+        QuestionAnalysis.objects.bulk_update(
+            to_update,
+            ["responses", "correct_count", "total_sum", "total_sq_sum", "correct_total_sum",
+             "distractors", "difficulty", "discrimination"],
+            batch_size=500,
+        )
+        state.submissions_count += processed
+        state.save()
+
+    return state
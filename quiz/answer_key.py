@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Quiz, Question
+from .pools import attempt_size, compile_pool
+from .text_match import compile_accepted
+
+ANSWER_KEY_TIMEOUT = getattr(settings, "QUIZ_ANSWER_KEY_TIMEOUT", 60 * 60 * 24)
+
+
+# Bumped whenever the answer key's layout changes, so entries cached by an
+# older release are not read
+ANSWER_KEY_FORMAT = 2
+
+
+# The cache key embeds Quiz.updated_at, so any change to the quiz (or a touch
+# from the Question/Answer signals) makes every worker miss and recompile.
+# Stale keys are never read again and simply expire.
+def answer_key_cache_key(quiz):
+    version = int(quiz.updated_at.timestamp() * 1_000_000)
+    return f"quiz:{quiz.pk}:answer_key:{ANSWER_KEY_FORMAT}:{version}"
+
+
+# Compile the Quiz -> Question -> Answer tree into plain, picklable data.
+# Each question carries what the attempt page renders ("answers") and what
+# grading needs ("choices", "correct_ids", and "accepted" compiled by
+# text_match.compile_accepted() from every correct answer's text).
+def build_answer_key(quiz):
+    questions = []
+    for q in Question.objects.filter(quiz=quiz).prefetch_related("answers").order_by("id"):
+        answers = list(q.answers.all())
+        questions.append({
+            "id": q.id,
+            "text": q.text,
+            "question_type": q.question_type,
+            "category": q.category,
+            "answers": [{"id": a.id, "text": a.text} for a in answers],
+            "choices": {str(a.id): a.text for a in answers},
+            "correct_ids": frozenset(str(a.id) for a in answers if a.is_correct),
+            "accepted": compile_accepted(a.text for a in answers if a.is_correct),
+        })
+
+    pool = compile_pool(quiz, questions)
+    return {
+        "quiz_id": quiz.pk,
+        "questions": questions,
+        "pool": pool,
+        "attempt_size": attempt_size(questions, pool),
+    }
+
+
+def get_answer_key(quiz):
+    key = answer_key_cache_key(quiz)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = build_answer_key(quiz)
+        cache.set(key, answer_key, ANSWER_KEY_TIMEOUT)
+    return answer_key
+
+
+# Bump Quiz.updated_at without loading the row; this moves the cache key.
+def touch_quiz(quiz_id):
+    Quiz.objects.filter(pk=quiz_id).update(updated_at=timezone.now())
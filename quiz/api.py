@@ -0,0 +1,59 @@
+import gzip
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .answer_key import answer_key_cache_key, get_answer_key
+from .pools import attempt_questions
+
+API_CACHE_TIMEOUT = getattr(settings, "QUIZ_API_CACHE_TIMEOUT", 60 * 60 * 24)
+
+
+# Public view of a quiz for API clients: the answer key minus anything that
+# reveals which answers are correct. A pooled attempt passes its drawn
+# questions and the signed token the submission must send back.
+def quiz_document(quiz, questions=None, pool=None):
+    if questions is None:
+        questions = get_answer_key(quiz)["questions"]
+    document = {
+        "id": quiz.pk,
+        "title": quiz.title,
+        "description": quiz.description,
+        "updated_at": quiz.updated_at.isoformat(),
+        "question_count": quiz.question_count,
+        "questions": [
+            {
+                "id": q["id"],
+                "text": q["text"],
+                "question_type": q["question_type"],
+                "answers": q["answers"] if q["question_type"] == "MCQ" else [],
+            }
+            for q in questions
+        ],
+    }
+    if pool:
+        document["pool"] = pool
+    return document
+
+
+def _dumps(document):
+    return json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+# Serialized once per quiz version: returns (json_bytes, gzipped_bytes).
+# The key shares the answer key's version, so any edit re-serializes.
+def quiz_json(quiz):
+    key = f"{answer_key_cache_key(quiz)}:api"
+    payload = cache.get(key)
+    if payload is None:
+        raw = _dumps(quiz_document(quiz))
+        payload = (raw, gzip.compress(raw, compresslevel=6))
+        cache.set(key, payload, API_CACHE_TIMEOUT)
+    return payload
+
+
+# One attempt at a pooled quiz: a fresh draw per call, so never cached
+def attempt_json(quiz, answer_key):
+    questions, token = attempt_questions(answer_key)
+    return _dumps(quiz_document(quiz, questions, pool=token))
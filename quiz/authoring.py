@@ -0,0 +1,84 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Quiz, Question, Answer
+from .page_cache import bump_listing_generation
+from .search import index_questions
+
+# Rows per INSERT statement; keeps each statement well under SQLite's
+# variable limit while still saving hundreds of questions in a few queries.
+BULK_BATCH_SIZE = 500
+
+
+# Validate the "questions" list of a create_quiz payload. `start` is the
+# number of the first question, so chunked uploads report global positions.
+def validate_questions(questions, start=1):
+    errors = []
+
+    for i, q in enumerate(questions, start=start):
+        if not q.get("text", "").strip():
+            errors.append(f"Question {i} text is required.")
+
+        ans = q.get("answers", [])
+        if len(ans) < 2:
+            errors.append(f"Question {i} must have at least 2 answers.")
+
+        correct_count = sum(bool(a.get("is_correct")) for a in ans)
+        if correct_count != 1:
+            errors.append(f"Question {i} must have exactly 1 correct answer.")
+
+    return errors
+
+
+# Insert all questions with one bulk_create, then all of their answers with
+# another. bulk_create returns primary keys on SQLite 3.35+ and PostgreSQL,
+# which is what lets the answers point at the new questions.
+def create_questions(quiz, questions, question_type="MCQ", batch_size=BULK_BATCH_SIZE):
+    question_objs = Question.objects.bulk_create(
+        [
+            Question(quiz=quiz, text=q["text"], question_type=question_type)
+            for q in questions
+        ],
+        batch_size=batch_size,
+    )
+
+    Answer.objects.bulk_create(
+        [
+            Answer(question=question, text=a["text"], is_correct=bool(a["is_correct"]))
+            for question, q in zip(question_objs, questions)
+            for a in q["answers"]
+        ],
+        batch_size=batch_size,
+    )
+
+    # bulk_create skips signals, so bump the answer-key version and the
+    # question count and index the new questions by hand
+    index_questions(question_objs)
+    Quiz.objects.filter(pk=quiz.pk).update(
+        updated_at=timezone.now(),
+        question_count=F("question_count") + len(question_objs),
+    )
+    bump_listing_generation()
+
+    return question_objs
+
+
+# Question.count() for each quiz, as a subquery usable in update()/annotate()
+def question_count_subquery():
+    counts = (
+        Question.objects
+        .filter(quiz=OuterRef("pk"))
+        .order_by()
+        .values("quiz")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+# Reset Quiz.question_count from the Question table for the given quizzes
+def recount_questions(quizzes):
+    updated = quizzes.update(question_count=question_count_subquery())
+    bump_listing_generation()
+    return updated
@@ -0,0 +1,157 @@
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .answer_key import get_answer_key
+from .authoring import create_questions
+from .grading import grade_submission, record_submissions
+from .models import Event, Quiz, UserProfile, UserSubmission
+
+# Maximum SQL queries per request on a warm cache. Each budget includes the
+# session and user lookups every authenticated request pays. A view that
+# starts issuing per-row queries blows through these immediately.
+QUERY_BUDGETS = {
+    "home": 2,
+    "quiz_list": 2,
+    "event_list": 2,
+    "quiz_attempt_get": 3,
+    "quiz_attempt_post": 10,
+    "quiz_history": 5,
+    "create_quiz": 10,
+}
+
+
+# Synthetic data: `quizzes` quizzes of `questions` questions with `answers`
+# choices each, plus `submissions` graded attempts per quiz by the bench user.
+def build_dataset(quizzes=5, questions=20, answers=4, submissions=50, events=10, seed=0, username="bench"):
+    rng = random.Random(seed)
+
+    user = User.objects.create_user(username, password="bench", is_staff=True)
+    UserProfile.objects.create(user=user, access_home=True, access_event=True, access_quiz=True)
+
+    today = timezone.now().date()
+    Event.objects.bulk_create([
+        Event(title=f"Event {i}", date=today + timedelta(days=i), location="Hall", created_by=user)
+        for i in range(events)
+    ])
+
+    quiz_objs = []
+    for i in range(quizzes):
+        quiz = Quiz.objects.create(title=f"Quiz {i}", description="Synthetic quiz", created_by=user)
+        create_questions(quiz, [
+            {"text": f"Question {i}.{j}", "answers": [
+                {"text": f"Answer {k}", "is_correct": k == 0} for k in range(answers)
+            ]}
+            for j in range(questions)
+        ])
+        quiz.refresh_from_db()
+        quiz_objs.append(quiz)
+
+        key = get_answer_key(quiz)["questions"]
+        pending = []
+        for _ in range(submissions):
+            post = {f"question_{q['id']}": rng.choice([a["id"] for a in q["answers"]]) for q in key}
+            post = {name: str(value) for name, value in post.items()}
+            score, graded = grade_submission(key, post)
+            pending.append((UserSubmission(quiz=quiz, user=user, user_name=user.username, score=score), graded))
+        if pending:
+            record_submissions(pending)
+
+    return {"user": user, "quizzes": quiz_objs}
+
+
+def attempt_post_data(quiz):
+    data = {"user_name": "bench"}
+    for q in get_answer_key(quiz)["questions"]:
+        if q["answers"]:
+            data[f"question_{q['id']}"] = str(q["answers"][0]["id"])
+    return data
+
+
+def create_quiz_payload(questions=20):
+    return json.dumps({
+        "title": "Benchmark quiz",
+        "description": "",
+        "questions": [
+            {"text": f"Question {i}", "answers": [
+                {"text": "right", "is_correct": True},
+                {"text": "wrong", "is_correct": False},
+            ]}
+            for i in range(questions)
+        ],
+    })
+
+
+# (name, callable(client, dataset) -> response) for every benchmarked view
+def scenarios(dataset):
+    quiz = dataset["quizzes"][0]
+    post_data = attempt_post_data(quiz)
+    payload = create_quiz_payload()
+    return [
+        ("home", lambda c: c.get("/")),
+        ("quiz_list", lambda c: c.get("/quizzes/")),
+        ("event_list", lambda c: c.get("/events/")),
+        ("quiz_attempt_get", lambda c: c.get(f"/quiz/{quiz.id}/")),
+        ("quiz_attempt_post", lambda c: c.post(f"/quiz/{quiz.id}/", post_data)),
+        ("quiz_history", lambda c: c.get("/history/")),
+        ("create_quiz", lambda c: c.post("/quizzes/create-quiz/", payload, content_type="application/json")),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# Drive each view `iterations` times (after one warm-up request) and collect
+# latency percentiles in milliseconds and the SQL query count.
+def run_benchmarks(dataset, iterations=20):
+    client = Client()
+    client.force_login(dataset["user"])
+
+    results = {}
+    for name, request in scenarios(dataset):
+        with CaptureQueriesContext(connection) as cold:
+            response = request(client)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name} returned HTTP {response.status_code}")
+
+        timings = []
+        query_counts = []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                request(client)
+                timings.append((time.perf_counter() - started) * 1000)
+            query_counts.append(len(ctx.captured_queries))
+
+        timings.sort()
+        results[name] = {
+            "iterations": iterations,
+            "p50_ms": round(percentile(timings, 0.50), 3),
+            "p95_ms": round(percentile(timings, 0.95), 3),
+            "p99_ms": round(percentile(timings, 0.99), 3),
+            "mean_ms": round(statistics.fmean(timings), 3) if timings else 0.0,
+            "queries": max(query_counts, default=0),
+            "cold_queries": len(cold.captured_queries),
+            "query_budget": QUERY_BUDGETS.get(name),
+        }
+    return results
+
+
+def budget_violations(results):
+    return {
+        name: (row["queries"], row["query_budget"])
+        for name, row in results.items()
+        if row["query_budget"] is not None and row["queries"] > row["query_budget"]
+    }
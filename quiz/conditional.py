@@ -0,0 +1,42 @@
+import hashlib
+from calendar import timegm
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+# ETag for a page whose content depends on `parts` (e.g. a model's
+# updated_at) plus who is looking at it: the user, their page access and
+# the CSRF secret, because a rotated secret (e.g. after login) invalidates
+# any form token embedded in an older copy of the page.
+def page_etag(request, *parts):
+    access = getattr(request, "access", None)
+    identity = [
+        request.user.pk,
+        access.mask if access is not None else "",
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+    ]
+    raw = "|".join(str(p) for p in (*parts, *identity))
+    return quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32])
+
+
+# Returns a 304 response when the client's copy is current, else None.
+# Pages with forms pass use_last_modified=False so only the ETag (which
+# covers the CSRF secret) can validate them.
+def not_modified(request, etag, updated_at, use_last_modified=True):
+    if request.method not in ("GET", "HEAD"):
+        return None
+    last_modified = timegm(updated_at.utctimetuple()) if use_last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, updated_at)
+    return response
+
+
+def set_validators(response, etag, updated_at):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(timegm(updated_at.utctimetuple()))
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Cookie"])
+    return response
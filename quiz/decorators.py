@@ -1,15 +1,20 @@
+from django.http import HttpResponse
 from django.shortcuts import redirect
 
+from .access import load_access
+
 def access_required(permission):
     def decorator(view_func):
         def wrapper(request, *args, **kwargs):
             if not request.user.is_authenticated:
                 return redirect("login")
 
-            profile = request.user.userprofile
+            access = getattr(request, "access", None)
+            if access is None:
+                access = load_access(request.user)
 
-            if not getattr(profile, permission):
-                return redirect("access_denied")
+            if not access.has(permission):
+                return HttpResponse("Access Denied", status=403)
                 
             return view_func(request, *args, **kwargs)
         
@@ -0,0 +1,138 @@
+import csv
+import io
+from collections import defaultdict
+from itertools import islice
+
+import numpy as np
+
+from .models import UserAnswer
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "columnar": ("application/octet-stream", "npy"),
+}
+
+
+# Submissions of a quiz in id order, one chunk at a time, each with its
+# answers as {submission_id: {question_id: (answer, is_correct)}}. Only one
+# chunk is ever held in memory.
+def submission_batches(quiz, chunk_size=EXPORT_CHUNK_SIZE):
+    submissions = (
+        quiz.submissions
+        .order_by("id")
+        .values_list("id", "user_name", "score", "submitted_at")
+        .iterator(chunk_size=chunk_size)
+    )
+    while batch := list(islice(submissions, chunk_size)):
+        answers = defaultdict(dict)
+        rows = (
+            UserAnswer.objects
+            .filter(submission__quiz=quiz, submission_id__gte=batch[0][0], submission_id__lte=batch[-1][0])
+            .values_list("submission_id", "question_id", "answer", "is_correct")
+            .iterator(chunk_size=chunk_size)
+        )
+        for submission_id, question_id, answer, is_correct in rows:
+            answers[submission_id][question_id] = (answer, is_correct)
+        yield batch, answers
+
+
+# Spreadsheets run cells starting with these as formulas; a leading quote
+# makes them plain text. Applies to everything users typed.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _safe_cell(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _question_columns(quiz):
+    return list(quiz.questions.order_by("id").values_list("id", "text"))
+
+
+# Wide CSV: one row per submission, one column per question holding the
+# answer given, with formula-like cells defused. Yields one string per
+# chunk.
+def iter_csv(quiz, chunk_size=EXPORT_CHUNK_SIZE):
+    questions = _question_columns(quiz)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(
+        ["submission_id", "user_name", "score", "submitted_at"]
+        + [f"Q{number}: {text}" for number, (_, text) in enumerate(questions, start=1)]
+    )
+    yield flush()
+
+    for batch, answers in submission_batches(quiz, chunk_size):
+        for submission_id, user_name, score, submitted_at in batch:
+            given = answers.get(submission_id, {})
+            writer.writerow(
+                [submission_id, _safe_cell(user_name), score, submitted_at.isoformat()]
+                + [_safe_cell(given.get(question_id, ("", False))[0]) for question_id, _ in questions]
+            )
+        yield flush()
+
+
+def _npy(array):
+    buffer = io.BytesIO()
+    np.lib.format.write_array(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+# Columnar binary: a stream of .npy arrays. The first is the question ids;
+# then each chunk contributes five arrays: submission ids (int64), user
+# names (unicode), scores (int32), submitted_at (int64 microseconds since the
+# epoch) and a submissions x questions int8 matrix (1 correct, 0 wrong,
+# -1 unanswered). Read it back with read_columnar().
+def iter_columnar(quiz, chunk_size=EXPORT_CHUNK_SIZE):
+    question_ids = [question_id for question_id, _ in _question_columns(quiz)]
+    columns = {question_id: col for col, question_id in enumerate(question_ids)}
+    yield _npy(np.asarray(question_ids, dtype=np.int64))
+
+    for batch, answers in submission_batches(quiz, chunk_size):
+        correct = np.full((len(batch), len(question_ids)), -1, dtype=np.int8)
+        for row, (submission_id, *_) in enumerate(batch):
+            for question_id, (_, is_correct) in answers.get(submission_id, {}).items():
+                col = columns.get(question_id)
+                if col is not None:
+                    correct[row, col] = is_correct
+
+        ids, names, scores, submitted = zip(*batch)
+        yield b"".join([
+            _npy(np.asarray(ids, dtype=np.int64)),
+            _npy(np.asarray(names, dtype=str)),
+            _npy(np.asarray(scores, dtype=np.int32)),
+            _npy(np.asarray([int(at.timestamp() * 1_000_000) for at in submitted], dtype=np.int64)),
+            _npy(correct),
+        ])
+
+
+# Inverse of iter_columnar() for a binary file object: returns the question
+# ids and yields (ids, names, scores, submitted_at, correct) per chunk.
+def read_columnar(fp):
+    question_ids = np.load(fp, allow_pickle=False)
+
+    def chunks():
+        while True:
+            try:
+                ids = np.load(fp, allow_pickle=False)
+            except EOFError:
+                return
+            yield (ids,) + tuple(np.load(fp, allow_pickle=False) for _ in range(4))
+
+    return question_ids, chunks()
+
+
+def iter_export(quiz, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    if export_format == "csv":
+        return iter_csv(quiz, chunk_size)
+    return iter_columnar(quiz, chunk_size)
@@ -0,0 +1,66 @@
+from django.db import transaction
+
+from .authoring import BULK_BATCH_SIZE
+from .histogram import record_score_bucket
+from .leaderboard import record_score
+from .models import UserSubmission, UserAnswer
+from .stats import record_attempt
+from .text_match import text_matches
+
+
+# Score a POST in memory against a compiled answer key (see answer_key.py).
+# Returns the total score and one (question_id, answer_text, is_correct) tuple
+# per question, ready to be written with record_submission().
+def grade_submission(questions, data):
+    score = 0
+    graded = []
+
+    for q in questions:
+        selected_answer = data.get(f"question_{q['id']}")
+
+        if q["question_type"] == "MCQ":
+            answer_text = q["choices"].get(selected_answer, "No answer")
+            is_correct = selected_answer in q["correct_ids"]
+        else:
+            answer_text = selected_answer or ""
+            is_correct = text_matches(q["accepted"], answer_text)
+
+        graded.append((q["id"], answer_text, is_correct))
+        if is_correct:
+            score += 1
+
+    return score, graded
+
+
+# Persist a graded submission: one insert for the submission (already carrying
+# its final score), one bulk insert for every UserAnswer row, and an atomic
+# bump of the user's stats row, leaderboard entry and score histogram.
+def record_submission(quiz, user, user_name, score, graded):
+    submission = UserSubmission(quiz=quiz, user=user, user_name=user_name, score=score)
+    return record_submissions([(submission, graded)])[0]
+
+
+# Batch form of record_submission(): takes (unsaved UserSubmission, graded)
+# pairs and writes all of them in one transaction with two bulk inserts.
+def record_submissions(pending):
+    with transaction.atomic():
+        submissions = UserSubmission.objects.bulk_create([submission for submission, _ in pending])
+        UserAnswer.objects.bulk_create(
+            [
+                UserAnswer(
+                    submission=submission,
+                    question_id=question_id,
+                    answer=answer_text,
+                    is_correct=is_correct,
+                )
+                for submission, (_, graded) in zip(submissions, pending)
+                for question_id, answer_text, is_correct in graded
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        for submission in submissions:
+            record_attempt(submission)
+            record_score(submission)
+            record_score_bucket(submission)
+
+    return submissions
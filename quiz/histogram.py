@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import ScoreBucket, UserSubmission
+
+HISTOGRAM_CACHE_TIMEOUT = 60 * 60
+
+
+def histogram_cache_key(quiz_id):
+    return f"quiz:{quiz_id}:histogram"
+
+
+# Count one submission in its quiz's score bucket. Same pattern as
+# record_attempt(): atomic F() increment, insert on the first hit.
+def record_score_bucket(submission):
+    lookup = {"quiz_id": submission.quiz_id, "score": submission.score}
+
+    if not ScoreBucket.objects.filter(**lookup).update(count=F("count") + 1):
+        try:
+            with transaction.atomic():
+                ScoreBucket.objects.create(**lookup, count=1)
+        except IntegrityError:
+            # Another request created the bucket first
+            ScoreBucket.objects.filter(**lookup).update(count=F("count") + 1)
+
+    quiz_id = submission.quiz_id
+    transaction.on_commit(lambda: cache.delete(histogram_cache_key(quiz_id)))
+
+
+# {score: count} for one quiz; one row per distinct score, cached.
+def get_histogram(quiz_id):
+    key = histogram_cache_key(quiz_id)
+    histogram = cache.get(key)
+    if histogram is None:
+        histogram = dict(
+            ScoreBucket.objects.filter(quiz_id=quiz_id).values_list("score", "count")
+        )
+        cache.set(key, histogram, HISTOGRAM_CACHE_TIMEOUT)
+    return histogram
+
+
+# Share of recorded submissions that scored strictly lower, as a percentage.
+def percentile_rank(histogram, score):
+    total = sum(histogram.values())
+    if not total:
+        return None
+    below = sum(count for bucket, count in histogram.items() if bucket < score)
+    return 100 * below / total
+
+
+# One bar per possible score 0..max_score, for charts.
+def distribution(histogram, max_score):
+    top = max(list(histogram.values()) + [1])
+    return [
+        {
+            "score": score,
+            "count": histogram.get(score, 0),
+            "height": 100 * histogram.get(score, 0) / top,
+        }
+        for score in range(max_score + 1)
+    ]
+
+
+# Recompute the buckets from UserSubmission (used by rebuild_score_histograms).
+def rebuild_histograms(quiz_ids=None):
+    submissions = UserSubmission.objects.all()
+    buckets = ScoreBucket.objects.all()
+    if quiz_ids:
+        submissions = submissions.filter(quiz_id__in=quiz_ids)
+        buckets = buckets.filter(quiz_id__in=quiz_ids)
+
+    counts = submissions.values("quiz_id", "score").annotate(n=Count("id")).order_by()
+    with transaction.atomic():
+        buckets.delete()
+        created = ScoreBucket.objects.bulk_create(
+            [ScoreBucket(quiz_id=row["quiz_id"], score=row["score"], count=row["n"]) for row in counts],
+            batch_size=1000,
+        )
+
+    for quiz_id in {bucket.quiz_id for bucket in created} | set(quiz_ids or ()):
+        cache.delete(histogram_cache_key(quiz_id))
+    return len(created)
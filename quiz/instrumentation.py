@@ -0,0 +1,133 @@
+import contextvars
+import heapq
+import threading
+import time
+from collections import deque
+
+from django.template.base import Template
+
+SLOWEST_STATEMENTS = 5
+
+# Metrics of the request being handled on this thread/task, if any
+current_metrics = contextvars.ContextVar("quiz_request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.slowest = []  # min-heap of (seconds, sql)
+
+    def record_query(self, sql, seconds):
+        self.queries += 1
+        self.sql_seconds += seconds
+        entry = (seconds, sql)
+        if len(self.slowest) < SLOWEST_STATEMENTS:
+            heapq.heappush(self.slowest, entry)
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def slowest_statements(self):
+        return [
+            {"ms": round(seconds * 1000, 3), "sql": sql}
+            for seconds, sql in sorted(self.slowest, reverse=True)
+        ]
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self.started
+
+
+# connection.execute_wrapper() hook: times every statement of the request
+def query_timer(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if metrics is not None:
+            metrics.record_query(sql, time.perf_counter() - started)
+
+
+# Template rendering has no hook outside the test runner, so wrap
+# Template.render once. Only the outermost render is timed; included
+# templates are already inside it.
+_template_patch_lock = threading.Lock()
+_original_template_render = None
+
+
+def install_template_timer():
+    global _original_template_render
+    with _template_patch_lock:
+        if _original_template_render is not None:
+            return
+        _original_template_render = Template.render
+
+        def timed_render(self, context):
+            metrics = current_metrics.get()
+            if metrics is None:
+                return _original_template_render(self, context)
+            metrics.template_depth += 1
+            started = time.perf_counter()
+            try:
+                return _original_template_render(self, context)
+            finally:
+                metrics.template_depth -= 1
+                if metrics.template_depth == 0:
+                    metrics.template_seconds += time.perf_counter() - started
+
+        Template.render = timed_render
+
+
+# In-process rolling window of the last `window` requests per view
+class RollingStats:
+    def __init__(self, window=500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def add(self, view_name, total_ms, sql_ms, queries, template_ms, slowest):
+        with self._lock:
+            view = self._views.get(view_name)
+            if view is None:
+                view = self._views[view_name] = {
+                    "samples": deque(maxlen=self.window),
+                    "slowest": [],
+                    "requests": 0,
+                }
+            view["samples"].append((total_ms, sql_ms, queries, template_ms))
+            view["requests"] += 1
+            view["slowest"] = sorted(view["slowest"] + slowest, key=lambda s: s["ms"], reverse=True)[:SLOWEST_STATEMENTS]
+
+    def summary(self):
+        with self._lock:
+            views = {name: (list(v["samples"]), list(v["slowest"]), v["requests"]) for name, v in self._views.items()}
+
+        rows = []
+        for name, (samples, slowest, requests) in views.items():
+            totals = sorted(s[0] for s in samples)
+            count = len(samples)
+            rows.append({
+                "view": name,
+                "requests": requests,
+                "window": count,
+                "mean_ms": sum(totals) / count,
+                "p95_ms": totals[min(count - 1, int(count * 0.95))],
+                "max_ms": totals[-1],
+                "mean_sql_ms": sum(s[1] for s in samples) / count,
+                "mean_queries": sum(s[2] for s in samples) / count,
+                "max_queries": max(s[2] for s in samples),
+                "mean_template_ms": sum(s[3] for s in samples) / count,
+                "slowest": slowest,
+            })
+        return sorted(rows, key=lambda r: r["mean_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+rolling_stats = RollingStats()
@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .models import LeaderboardEntry, UserSubmission
+
+LEADERBOARD_SIZE = getattr(settings, "QUIZ_LEADERBOARD_SIZE", 10)
+LEADERBOARD_CACHE_TIMEOUT = 60 * 60
+RANKING = ("-best_score", "achieved_at", "id")
+
+
+def leaderboard_cache_key(quiz_id):
+    return f"quiz:{quiz_id}:leaderboard"
+
+
+# Ranked rows for display, served from the cache until the board changes
+def get_leaderboard(quiz_id):
+    key = leaderboard_cache_key(quiz_id)
+    rows = cache.get(key)
+    if rows is None:
+        entries = (
+            LeaderboardEntry.objects
+            .filter(quiz_id=quiz_id)
+            .select_related("user")
+            .order_by(*RANKING)[:LEADERBOARD_SIZE]
+        )
+        rows = [
+            {
+                "rank": rank,
+                "user_id": e.user_id,
+                "username": e.user.username,
+                "score": e.best_score,
+                "achieved_at": e.achieved_at,
+            }
+            for rank, e in enumerate(entries, start=1)
+        ]
+        cache.set(key, rows, LEADERBOARD_CACHE_TIMEOUT)
+    return rows
+
+
+# Fold one submission into its quiz's top-N. Only the user's best score
+# counts, and an equal score never displaces an earlier one, so a new
+# submission enters only by strictly beating the current last place.
+def record_score(submission):
+    if submission.user_id is None:
+        return
+
+    entries = list(LeaderboardEntry.objects.filter(quiz_id=submission.quiz_id).order_by(*RANKING))
+    mine = next((e for e in entries if e.user_id == submission.user_id), None)
+
+    if mine is not None:
+        if submission.score <= mine.best_score:
+            return
+        mine.best_score = submission.score
+        mine.achieved_at = submission.submitted_at
+        mine.save(update_fields=["best_score", "achieved_at"])
+    else:
+        full = len(entries) >= LEADERBOARD_SIZE
+        if full and submission.score <= entries[LEADERBOARD_SIZE - 1].best_score:
+            return
+        try:
+            with transaction.atomic():
+                LeaderboardEntry.objects.create(
+                    quiz_id=submission.quiz_id,
+                    user_id=submission.user_id,
+                    best_score=submission.score,
+                    achieved_at=submission.submitted_at,
+                )
+        except IntegrityError:
+            # The same user's concurrent submission got there first
+            LeaderboardEntry.objects.filter(
+                quiz_id=submission.quiz_id, user_id=submission.user_id, best_score__lt=submission.score,
+            ).update(best_score=submission.score, achieved_at=submission.submitted_at)
+        trim_leaderboard(submission.quiz_id)
+
+    quiz_id = submission.quiz_id
+    transaction.on_commit(lambda: cache.delete(leaderboard_cache_key(quiz_id)))
+
+
+def trim_leaderboard(quiz_id):
+    overflow = (
+        LeaderboardEntry.objects
+        .filter(quiz_id=quiz_id)
+        .order_by(*RANKING)
+        .values_list("id", flat=True)[LEADERBOARD_SIZE:]
+    )
+    overflow = list(overflow)
+    if overflow:
+        LeaderboardEntry.objects.filter(id__in=overflow).delete()
+
+
+# Recompute one quiz's board from its submission history: walk submissions
+# best-first and keep each user's first (best, earliest) row until the board
+# is full.
+def rebuild_leaderboard(quiz_id):
+    best = {}
+    submissions = (
+        UserSubmission.objects
+        .filter(quiz_id=quiz_id, user__isnull=False)
+        .order_by("-score", "submitted_at", "id")
+        .values_list("user_id", "score", "submitted_at")
+    )
+    for user_id, score, submitted_at in submissions.iterator(chunk_size=2000):
+        if user_id not in best:
+            best[user_id] = (score, submitted_at)
+            if len(best) >= LEADERBOARD_SIZE:
+                break
+
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(quiz_id=quiz_id).delete()
+        LeaderboardEntry.objects.bulk_create([
+            LeaderboardEntry(quiz_id=quiz_id, user_id=user_id, best_score=score, achieved_at=achieved_at)
+            for user_id, (score, achieved_at) in best.items()
+        ])
+    cache.delete(leaderboard_cache_key(quiz_id))
+    return len(best)
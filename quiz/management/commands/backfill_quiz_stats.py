@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from quiz.stats import rebuild_quiz_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user quiz statistics table from all recorded submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Rows per INSERT statement (default: 1000).")
+
+    def handle(self, *args, **options):
+        created = rebuild_quiz_stats(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} quiz statistics rows."))
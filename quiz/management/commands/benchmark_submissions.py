@@ -0,0 +1,88 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from quiz.answer_key import get_answer_key
+from quiz.authoring import create_questions
+from quiz.grading import grade_submission, record_submission
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure submission throughput with concurrent writer threads against the "
+        "configured database. Run it once per settings profile to compare them, e.g. "
+        "--settings=quiz_app.settings and --settings=quiz_app.settings_production. "
+        "A scratch quiz and user are created and removed again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--submissions", type=int, default=50, help="Submissions per thread.")
+        parser.add_argument("--questions", type=int, default=50, help="Questions in the scratch quiz.")
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(f"bench-{time.time_ns()}")
+        quiz = Quiz.objects.create(title="Submission benchmark", created_by=user)
+        create_questions(quiz, [
+            {"text": f"Question {i}", "answers": [
+                {"text": "right", "is_correct": True},
+                {"text": "wrong", "is_correct": False},
+            ]}
+            for i in range(options["questions"])
+        ])
+        quiz.refresh_from_db()
+        questions = get_answer_key(quiz)["questions"]
+        post = {f"question_{q['id']}": next(iter(q["correct_ids"])) for q in questions}
+
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            local = []
+            try:
+                for _ in range(options["submissions"]):
+                    started = time.perf_counter()
+                    try:
+                        score, graded = grade_submission(questions, post)
+                        record_submission(quiz, user, user.username, score, graded)
+                    except OperationalError as exc:
+                        with lock:
+                            errors.append(str(exc))
+                        continue
+                    local.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        quiz.delete()
+        user.delete()
+
+        latencies.sort()
+        db = settings.DATABASES["default"]
+        self.stdout.write(f"Database: {db['ENGINE']} (CONN_MAX_AGE={db.get('CONN_MAX_AGE', 0)})")
+        self.stdout.write(f"Pragmas: {getattr(settings, 'QUIZ_SQLITE_PRAGMAS', None) or 'none'}")
+        self.stdout.write(
+            f"{len(latencies)} submissions saved, {len(errors)} failed, in {elapsed:.2f}s "
+            f"({len(latencies) / elapsed:.1f} submissions/s)"
+        )
+        if latencies:
+            p50 = latencies[len(latencies) // 2] * 1000
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            self.stdout.write(f"Latency p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+        if errors:
+            self.stdout.write(self.style.WARNING(f"First error: {errors[0]}"))
@@ -0,0 +1,87 @@
+import json
+import platform
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from quiz.benchmarks import budget_violations, build_dataset, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a synthetic dataset in a throwaway test database, drive the main quiz "
+        "views through the test client and report latency percentiles and SQL query "
+        "counts per view. Results can be written as JSON to compare across commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quizzes", type=int, default=5)
+        parser.add_argument("--questions", type=int, default=50)
+        parser.add_argument("--answers", type=int, default=4)
+        parser.add_argument("--submissions", type=int, default=200, help="Submissions per quiz.")
+        parser.add_argument("--events", type=int, default=20)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--output", help="Write results to this JSON file.")
+        parser.add_argument("--enforce-budgets", action="store_true",
+                            help="Exit with an error if any view exceeds its query budget.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            started = time.perf_counter()
+            dataset = build_dataset(
+                quizzes=options["quizzes"],
+                questions=options["questions"],
+                answers=options["answers"],
+                submissions=options["submissions"],
+                events=options["events"],
+            )
+            build_seconds = time.perf_counter() - started
+            results = run_benchmarks(dataset, iterations=options["iterations"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(f"Dataset built in {build_seconds:.2f}s")
+        self.stdout.write(f"{'view':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'budget':>8}")
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<20}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+                f"{row['queries']:>10}{row['query_budget'] or '-':>8}"
+            )
+
+        if options["output"]:
+            report = {
+                "commit": self.git_commit(),
+                "django": django.get_version(),
+                "python": platform.python_version(),
+                "database": settings.DATABASES["default"]["ENGINE"],
+                "dataset": {key: options[key] for key in ("quizzes", "questions", "answers", "submissions", "events")},
+                "results": results,
+            }
+            with open(options["output"], "w", encoding="utf-8") as fp:
+                json.dump(report, fp, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        violations = budget_violations(results)
+        if violations:
+            message = ", ".join(f"{name}: {used} > {budget}" for name, (used, budget) in violations.items())
+            if options["enforce_budgets"]:
+                raise CommandError(f"Query budgets exceeded: {message}")
+            self.stdout.write(self.style.WARNING(f"Query budgets exceeded: {message}"))
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
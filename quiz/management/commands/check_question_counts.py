@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from quiz.authoring import question_count_subquery, recount_questions
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Compare Quiz.question_count with the Question table and optionally repair it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repair", action="store_true",
+                            help="Rewrite the stored count for every quiz that is out of sync.")
+
+    def handle(self, *args, **options):
+        drifted = (
+            Quiz.objects
+            .annotate(actual_count=question_count_subquery())
+            .exclude(question_count=F("actual_count"))
+            .values_list("id", "title", "question_count", "actual_count")
+        )
+
+        drifted_ids = []
+        for quiz_id, title, stored, actual in drifted:
+            drifted_ids.append(quiz_id)
+            self.stdout.write(f"Quiz {quiz_id} ({title}): stored {stored}, actual {actual}")
+
+        if not drifted_ids:
+            self.stdout.write(self.style.SUCCESS("All question counts are consistent."))
+            return
+
+        if options["repair"]:
+            repaired = recount_questions(Quiz.objects.filter(pk__in=drifted_ids))
+            self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} quizzes."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"{len(drifted_ids)} quizzes out of sync; rerun with --repair to fix them."
+            ))
@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_export
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Stream a quiz's submissions and answers as wide CSV or columnar .npy."
+
+    def add_arguments(self, parser):
+        parser.add_argument("quiz_id", type=int)
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv",
+                            help="Output format (default: csv).")
+        parser.add_argument("--output", "-o",
+                            help="File to write; defaults to standard output.")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE,
+                            help=f"Submissions fetched per query (default: {EXPORT_CHUNK_SIZE}).")
+
+    def handle(self, *args, **options):
+        try:
+            quiz = Quiz.objects.get(id=options["quiz_id"])
+        except Quiz.DoesNotExist:
+            raise CommandError(f"Quiz {options['quiz_id']} does not exist")
+
+        binary = options["format"] != "csv"
+        if options["output"]:
+            out = open(options["output"], "wb" if binary else "w", newline=None if binary else "")
+        else:
+            out = sys.stdout.buffer if binary else sys.stdout
+
+        try:
+            for chunk in iter_export(quiz, options["format"], options["chunk_size"]):
+                out.write(chunk)
+        finally:
+            if options["output"]:
+                out.close()
@@ -0,0 +1,323 @@
+import json
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from quiz.authoring import validate_questions, create_questions, question_count_subquery
+from quiz.models import Question, Quiz
+from quiz.page_cache import bump_listing_generation
+from quiz.search import index_questions, index_quizzes
+
+READ_SIZE = 64 * 1024
+_WHITESPACE = " \t\r\n"
+
+
+# bulk_create() runs pre_save(add=True), which lets auto_now/auto_now_add
+# overwrite the fixture's timestamps. Switch them off for the duration (like
+# loaddata's raw saves) and fill only the values the fixture left out.
+@contextmanager
+def fixture_timestamps(by_model):
+    now = timezone.now()
+    switched = []
+    for model, objs in by_model.items():
+        for field in model._meta.concrete_fields:
+            if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+                switched.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+                for obj in objs:
+                    if getattr(obj, field.attname) is None:
+                        setattr(obj, field.attname, now)
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in switched:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+# Minimal incremental JSON reader: it keeps only a sliding window of the file
+# in memory and decodes one array element at a time with raw_decode().
+class JSONStream:
+    def __init__(self, fp):
+        self.fp = fp
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=READ_SIZE):
+        if self.eof:
+            return False
+        chunk = self.fp.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise CommandError(f"Invalid JSON: expected {char!r} near offset {self.pos}.")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        size = READ_SIZE
+        decoder = json.JSONDecoder()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Incomplete value: read more, growing the read size so a
+                # single huge element is not re-scanned quadratically.
+                if not self._fill(size):
+                    raise CommandError(f"Invalid or truncated JSON near offset {self.pos}.")
+                size *= 2
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and not isinstance(obj, (dict, list, str)):
+                self._fill()
+                continue
+            self.pos = end
+            return obj
+
+    def items(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise CommandError(f"Invalid JSON: expected ',' or ']' near offset {self.pos}.")
+
+    def members(self):
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise CommandError(f"Invalid JSON: expected ',' or '}}' near offset {self.pos}.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream quizzes, questions and answers from a JSON file into the database. "
+        "Accepts Django fixtures (like quiz/fixtures/quiz_data.json), a single "
+        "create_quiz payload, or a list of create_quiz payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSON file to import.")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Rows per INSERT statement, for fixtures and payloads (default: 1000).")
+        parser.add_argument("--batches-per-transaction", type=int, default=10,
+                            help="Batches committed together (default: 10).")
+        parser.add_argument("--user", help="Username recorded as created_by for create_quiz payloads.")
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.transaction_rows = self.batch_size * options["batches_per_transaction"]
+        if self.batch_size < 1 or self.transaction_rows < 1:
+            raise CommandError("--batch-size and --batches-per-transaction must be positive.")
+
+        self.created_by = None
+        if options["user"]:
+            self.created_by = User.objects.filter(username=options["user"]).first()
+            if self.created_by is None:
+                raise CommandError(f"User {options['user']!r} does not exist.")
+
+        self.rows = 0
+        self.pending = []
+        self.pending_models = set()
+        self.loaded_quiz_ids = set()
+        self.started = time.monotonic()
+
+        with open(options["path"], encoding="utf-8") as fp:
+            stream = JSONStream(fp)
+            first = stream.peek()
+            if first == "[":
+                for item in stream.items():
+                    if "model" in item:
+                        self.add_fixture_object(item)
+                    else:
+                        self.flush()
+                        self.import_payload(item)
+            elif first == "{":
+                self.import_streamed_payload(stream)
+            else:
+                raise CommandError("Expected a JSON array or object.")
+
+        self.flush()
+        self.reset_sequences()
+
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.rows} rows in {elapsed:.2f}s ({self.rows / elapsed:.0f} rows/s)."
+        ))
+
+    # FIXTURE FORMAT
+    def add_fixture_object(self, item):
+        try:
+            obj = next(serializers.deserialize("python", [item], ignorenonexistent=True)).object
+        except Exception as exc:
+            raise CommandError(f"Could not load fixture object {item.get('model')}:{item.get('pk')}: {exc}")
+        self.pending.append(obj)
+        self.pending_models.add(type(obj))
+        if len(self.pending) >= self.transaction_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        # Group by model in first-seen order; FK checks are deferred until
+        # commit, so rows referencing each other inside one chunk are fine.
+        by_model = {}
+        for obj in self.pending:
+            by_model.setdefault(type(obj), []).append(obj)
+
+        with transaction.atomic(), fixture_timestamps(by_model):
+            for model, objs in by_model.items():
+                fields = [f.name for f in model._meta.concrete_fields if not f.primary_key]
+                model.objects.bulk_create(
+                    objs,
+                    batch_size=self.batch_size,
+                    update_conflicts=True,
+                    unique_fields=[model._meta.pk.name],
+                    update_fields=fields,
+                )
+            self.touch_quizzes(by_model)
+            index_quizzes(by_model.get(Quiz, ()))
+            index_questions(by_model.get(Question, ()))
+        bump_listing_generation()
+
+        self.rows += len(self.pending)
+        self.pending = []
+        self.report()
+
+    # bulk_create skips signals; recount the questions of every quiz touched
+    # in this chunk. Quizzes whose own row came from this file keep the
+    # fixture's updated_at (as with loaddata); the others get a new
+    # answer-key version.
+    def touch_quizzes(self, by_model):
+        chunk_ids = {q.pk for model, objs in by_model.items() if model is Quiz for q in objs}
+        self.loaded_quiz_ids |= chunk_ids
+        loaded_ids = self.loaded_quiz_ids
+        quiz_ids = {q.quiz_id for model, objs in by_model.items() if model._meta.model_name == "question" for q in objs}
+        question_ids = {a.question_id for model, objs in by_model.items() if model._meta.model_name == "answer" for a in objs}
+        touched = chunk_ids | (quiz_ids & loaded_ids)
+        if touched:
+            Quiz.objects.filter(pk__in=touched).update(question_count=question_count_subquery())
+        if quiz_ids or question_ids:
+            quizzes = Quiz.objects.filter(Q(pk__in=quiz_ids) | Q(questions__in=question_ids)).distinct()
+            Quiz.objects.filter(pk__in=quizzes.values("pk")).exclude(pk__in=loaded_ids).update(
+                updated_at=timezone.now(),
+                question_count=question_count_subquery(),
+            )
+
+    def reset_sequences(self):
+        if not self.pending_models:
+            return
+        statements = connection.ops.sequence_reset_sql(no_style(), list(self.pending_models))
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    # CREATE_QUIZ PAYLOAD FORMAT
+    # Each batch commits on its own, so the quiz stays a draft (hidden, like a
+    # chunked upload in create_quiz) until the last one is in, and is deleted
+    # if any batch fails or the run is interrupted.
+    @contextmanager
+    def draft_quiz(self, fields):
+        title = (fields.get("title") or "").strip()
+        if not title:
+            raise CommandError("Quiz title is required.")
+        self.rows += 1
+        quiz = Quiz.objects.create(
+            title=title,
+            description=(fields.get("description") or "").strip(),
+            created_by=self.created_by,
+            is_published=False,
+        )
+        try:
+            yield quiz
+        except BaseException:
+            quiz.delete()
+            raise
+        Quiz.objects.filter(pk=quiz.pk).update(is_published=True)
+        bump_listing_generation()
+
+    def write_questions(self, quiz, questions, offset):
+        errors = validate_questions(questions, start=offset + 1)
+        if errors:
+            raise CommandError(f"Quiz {quiz.title!r}: " + " ".join(errors))
+        with transaction.atomic():
+            create_questions(quiz, questions, batch_size=self.batch_size)
+        self.rows += len(questions) + sum(len(q["answers"]) for q in questions)
+        self.report()
+
+    def import_payload(self, data):
+        questions = data.get("questions", [])
+        step = self.transaction_rows
+        with self.draft_quiz(data) as quiz:
+            for offset in range(0, len(questions), step):
+                self.write_questions(quiz, questions[offset:offset + step], offset)
+
+    # A single payload object: stream its "questions" array so a huge bank
+    # never has to be held in memory. Title/description must come first.
+    def import_streamed_payload(self, stream):
+        fields = {}
+        imported = False
+        for key in stream.members():
+            if key != "questions":
+                fields[key] = stream.value()
+                continue
+
+            with self.draft_quiz(fields) as quiz:
+                batch, offset = [], 0
+                for question in stream.items():
+                    batch.append(question)
+                    if len(batch) >= self.transaction_rows:
+                        self.write_questions(quiz, batch, offset)
+                        offset += len(batch)
+                        batch = []
+                if batch:
+                    self.write_questions(quiz, batch, offset)
+            imported = True
+
+        if not imported:
+            with self.draft_quiz(fields):
+                pass
+
+    def report(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        self.stdout.write(f"  {self.rows} rows ({self.rows / elapsed:.0f} rows/s)")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from quiz.leaderboard import rebuild_leaderboard
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Recompute quiz leaderboards from the submission history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quiz", type=int, action="append", dest="quiz_ids",
+                            help="Only rebuild this quiz (may be repeated).")
+
+    def handle(self, *args, **options):
+        quiz_ids = options["quiz_ids"] or Quiz.objects.order_by("id").values_list("id", flat=True)
+        total = 0
+        for quiz_id in quiz_ids:
+            total += 1
+            entries = rebuild_leaderboard(quiz_id)
+            self.stdout.write(f"Quiz {quiz_id}: {entries} entries")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} leaderboards."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from quiz.histogram import rebuild_histograms
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-quiz score histograms from all recorded submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quiz", type=int, action="append", dest="quiz_ids",
+                            help="Only rebuild this quiz (may be repeated).")
+
+    def handle(self, *args, **options):
+        created = rebuild_histograms(options["quiz_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} score buckets."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from quiz.analytics import ANALYSIS_CHUNK_SIZE, refresh_item_analysis
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Fold new submissions into the per-question item analysis tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quiz", type=int, action="append", dest="quiz_ids",
+                            help="Only refresh this quiz (may be repeated).")
+        parser.add_argument("--full", action="store_true",
+                            help="Recompute from every submission instead of only new ones.")
+        parser.add_argument("--chunk-size", type=int, default=ANALYSIS_CHUNK_SIZE,
+                            help=f"Submissions per matrix chunk (default: {ANALYSIS_CHUNK_SIZE}).")
+
+    def handle(self, *args, **options):
+        quizzes = Quiz.objects.order_by("id")
+        if options["quiz_ids"]:
+            quizzes = quizzes.filter(id__in=options["quiz_ids"])
+
+        for quiz in quizzes.iterator():
+            state = refresh_item_analysis(quiz, full=options["full"], chunk_size=options["chunk_size"])
+            self.stdout.write(f"Quiz {quiz.id}: {state.submissions_count} submissions analysed")
+        self.stdout.write(self.style.SUCCESS("Item analysis up to date."))
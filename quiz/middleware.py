@@ -0,0 +1,125 @@
+import cProfile
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.functional import SimpleLazyObject
+
+from .access import load_access
+from .profiling import save_profile
+from .instrumentation import (
+    RequestMetrics, current_metrics, install_template_timer, query_timer, rolling_stats,
+)
+
+performance_logger = logging.getLogger("quiz.performance")
+profiling_logger = logging.getLogger("quiz.profiling")
+
+
+# Exposes the user's cached page permissions as request.access.
+# Must come after AuthenticationMiddleware.
+class AccessMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.access = SimpleLazyObject(lambda: load_access(request.user))
+        return self.get_response(request)
+
+
+# Opt-in (QUIZ_PERF_INSTRUMENTATION = True) per-request SQL and template
+# timing. Adds a Server-Timing header, logs one structured line per request
+# to the "quiz.performance" logger and feeds the staff stats page.
+class QueryTimingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "QUIZ_PERF_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_template_timer()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(query_timer))
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+
+        total_ms = metrics.total_seconds * 1000
+        sql_ms = metrics.sql_seconds * 1000
+        template_ms = metrics.template_seconds * 1000
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else request.path
+
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={sql_ms:.1f};desc="{metrics.queries} queries"',
+            f"tpl;dur={template_ms:.1f}",
+            f"total;dur={total_ms:.1f}",
+        ])
+
+        slowest = metrics.slowest_statements()
+        performance_logger.info(json.dumps({
+            "view": view_name,
+            "method": request.method,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 3),
+            "sql_ms": round(sql_ms, 3),
+            "queries": metrics.queries,
+            "template_ms": round(template_ms, 3),
+            "slowest": slowest,
+        }))
+        rolling_stats.add(view_name, total_ms, sql_ms, metrics.queries, template_ms, slowest)
+        return response
+
+
+# Profiles a request with cProfile when a staff user adds ?profile=1, or when
+# QUIZ_PROFILE_SAMPLE_RATE selects it at random. Runs are kept in a bounded
+# on-disk ring buffer and browsed at /stats/profiles/.
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reason = self.profile_reason(request)
+        if reason is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+
+        try:
+            name = save_profile(profiler, request, response, elapsed, reason)
+        except OSError:
+            profiling_logger.exception("Could not store request profile")
+        else:
+            # Only the staff member who asked gets a pointer to the profile;
+            # sampled runs stay invisible to the client
+            if reason == "staff":
+                response["X-Profile-Id"] = name
+        return response
+
+    def profile_reason(self, request):
+        if request.GET.get("profile") and getattr(request, "user", None) and request.user.is_staff:
+            return "staff"
+        rate = getattr(settings, "QUIZ_PROFILE_SAMPLE_RATE", 0)
+        if rate and random.random() < rate:
+            return "sampled"
+        return None
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:15
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+import django.db.models.deletion
+
+
+# Seed the table from existing submissions (same totals as
+# quiz.stats.rebuild_quiz_stats, which cannot be imported here)
+def populate_user_quiz_stats(apps, schema_editor):
+    UserSubmission = apps.get_model("quiz", "UserSubmission")
+    UserQuizStats = apps.get_model("quiz", "UserQuizStats")
+    totals = (
+        UserSubmission.objects
+        .filter(user__isnull=False)
+        .values("user_id", "quiz_id")
+        .annotate(attempts=Count("id"), total=Sum("score"), best=Max("score"), last=Max("submitted_at"))
+        .order_by()
+    )
+    UserQuizStats.objects.bulk_create(
+        [
+            UserQuizStats(
+                user_id=row["user_id"],
+                quiz_id=row["quiz_id"],
+                attempts_count=row["attempts"],
+                score_sum=row["total"] or 0,
+                best_score=row["best"] or 0,
+                last_attempt_at=row["last"],
+            )
+            for row in totals.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('quiz', '0006_userprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserQuizStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveIntegerField(default=0)),
+                ('best_score', models.IntegerField(default=0)),
+                ('last_attempt_at', models.DateTimeField()),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_stats', to='quiz.quiz')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'quiz')},
+            },
+        ),
+        migrations.RunPython(populate_user_quiz_stats, migrations.RunPython.noop),
+    ]
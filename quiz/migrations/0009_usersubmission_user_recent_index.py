@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_quiz_question_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usersubmission',
+            index=models.Index(fields=['user', '-submitted_at', '-id'], name='quiz_sub_user_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Seed the boards from existing submissions (same ranking as
+# quiz.leaderboard.rebuild_leaderboard, which cannot be imported here):
+# each user's best, earliest score, top QUIZ_LEADERBOARD_SIZE per quiz.
+def populate_leaderboards(apps, schema_editor):
+    UserSubmission = apps.get_model("quiz", "UserSubmission")
+    LeaderboardEntry = apps.get_model("quiz", "LeaderboardEntry")
+    size = getattr(settings, "QUIZ_LEADERBOARD_SIZE", 10)
+    submissions = (
+        UserSubmission.objects
+        .filter(user__isnull=False)
+        .order_by("quiz_id", "-score", "submitted_at", "id")
+        .values_list("quiz_id", "user_id", "score", "submitted_at")
+    )
+    boards = {}
+    for quiz_id, user_id, score, submitted_at in submissions.iterator(chunk_size=2000):
+        board = boards.setdefault(quiz_id, {})
+        if user_id not in board and len(board) < size:
+            board[user_id] = (score, submitted_at)
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(quiz_id=quiz_id, user_id=user_id, best_score=score, achieved_at=achieved_at)
+            for quiz_id, board in boards.items()
+            for user_id, (score, achieved_at) in board.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('quiz', '0010_event_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('best_score', models.IntegerField()),
+                ('achieved_at', models.DateTimeField()),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='quiz.quiz')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['quiz', '-best_score', 'achieved_at'], name='quiz_leaderboard_rank_idx')],
+                'unique_together': {('quiz', 'user')},
+            },
+        ),
+        migrations.RunPython(populate_leaderboards, migrations.RunPython.noop),
+    ]
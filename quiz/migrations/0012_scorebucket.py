@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:26
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+# Seed the histograms from existing submissions (same counts as
+# quiz.histogram.rebuild_histograms, which cannot be imported here)
+def populate_score_buckets(apps, schema_editor):
+    UserSubmission = apps.get_model("quiz", "UserSubmission")
+    ScoreBucket = apps.get_model("quiz", "ScoreBucket")
+    counts = UserSubmission.objects.values("quiz_id", "score").annotate(n=Count("id")).order_by()
+    ScoreBucket.objects.bulk_create(
+        [ScoreBucket(quiz_id=row["quiz_id"], score=row["score"], count=row["n"]) for row in counts.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0011_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_buckets', to='quiz.quiz')),
+            ],
+            options={
+                'unique_together': {('quiz', 'score')},
+            },
+        ),
+        migrations.RunPython(populate_score_buckets, migrations.RunPython.noop),
+    ]
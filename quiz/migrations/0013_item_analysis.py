@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0012_scorebucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('correct_count', models.PositiveIntegerField(default=0)),
+                ('total_sum', models.BigIntegerField(default=0)),
+                ('total_sq_sum', models.BigIntegerField(default=0)),
+                ('correct_total_sum', models.BigIntegerField(default=0)),
+                ('distractors', models.JSONField(default=dict)),
+                ('difficulty', models.FloatField(null=True)),
+                ('discrimination', models.FloatField(null=True)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analysis', to='quiz.question')),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_analyses', to='quiz.quiz')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ItemAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_submission_id', models.BigIntegerField(default=0)),
+                ('submissions_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quiz', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='item_analysis', to='quiz.quiz')),
+            ],
+        ),
+    ]
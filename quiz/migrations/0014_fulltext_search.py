@@ -0,0 +1,58 @@
+from django.db import migrations
+
+
+# External-content FTS5 tables over quiz_quiz and quiz_question. Triggers keep
+# them in sync with every write, including bulk_create() and
+# QuerySet.update(), which bypass model signals. Only SQLite gets the index;
+# other backends fall back to LIKE in quiz.search. Superseded by 0018: table
+# rebuilds in later migrations drop these triggers.
+INDEXES = (
+    ("quiz_search_quiz", "quiz_quiz", ("title", "description")),
+    ("quiz_search_question", "quiz_question", ("text",)),
+)
+
+
+def _statements(index, table, columns):
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {index} USING fts5({cols}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {index}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {index}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {index}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {index}({index}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {index}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {index}({index}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {index}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {index}({index}) VALUES ('rebuild')",
+    ]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for index, table, columns in INDEXES:
+        for statement in _statements(index, table, columns):
+            schema_editor.execute(statement)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for index, _, _ in INDEXES:
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {index}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {index}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0013_item_analysis'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0014_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='category',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='pool_quotas',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='pool_size',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0015_question_pools'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date'], name='quiz_event_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useranswer',
+            index=models.Index(fields=['submission', 'question'], name='quiz_ua_sub_question_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersubmission',
+            index=models.Index(fields=['quiz', 'score'], name='quiz_sub_quiz_score_idx'),
+        ),
+        # The composite index leads with submission_id, so the FK's own
+        # index is dropped only after it exists
+        migrations.AlterField(
+            model_name='useranswer',
+            name='submission',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='user_answers', to='quiz.usersubmission'),
+        ),
+    ]
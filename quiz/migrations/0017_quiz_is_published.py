@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0016_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='is_published',
+            field=models.BooleanField(default=True),
+        ),
+    ]
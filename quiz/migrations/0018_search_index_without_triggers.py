@@ -0,0 +1,51 @@
+from importlib import import_module
+
+from django.db import migrations
+
+fulltext_search = import_module("quiz.migrations.0014_fulltext_search")
+
+
+# Replace the trigger-synced external-content tables from 0014 with regular
+# FTS5 tables that quiz.search writes from signals. The triggers were lost
+# whenever a migration rebuilt quiz_quiz or quiz_question (0015 already did).
+INDEXES = (
+    ("quiz_search_quiz", "quiz_quiz", ("title", "description")),
+    ("quiz_search_question", "quiz_question", ("text",)),
+)
+
+
+def _drop(schema_editor):
+    for index, _, _ in INDEXES:
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {index}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {index}")
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    _drop(schema_editor)
+    for index, table, columns in INDEXES:
+        cols = ", ".join(columns)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {index} USING fts5({cols}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(f"INSERT INTO {index}(rowid, {cols}) SELECT id, {cols} FROM {table}")
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    _drop(schema_editor)
+    fulltext_search.create_indexes(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0017_quiz_is_published'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, restore_triggers),
+    ]
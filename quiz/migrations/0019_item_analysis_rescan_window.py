@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0018_search_index_without_triggers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemanalysis',
+            name='recent_submission_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='itemanalysis',
+            name='rescan_from',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils.functional import cached_property
 from django.contrib.auth.models import User
 
 # Quizzes Model
@@ -8,10 +10,32 @@ class Quiz(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="created_quizzes", null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized Question count, maintained by signals and bulk authoring
+    question_count = models.PositiveIntegerField(default=0, editable=False)
+    # False while a chunked upload is still in progress (see create_quiz)
+    is_published = models.BooleanField(default=True)
+    # Random question pool: each attempt draws pool_size questions, with
+    # pool_quotas ({"category": count}) reserving places per category
+    pool_size = models.PositiveIntegerField(null=True, blank=True)
+    pool_quotas = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return self.title
 
+    def clean(self):
+        if not isinstance(self.pool_quotas, dict) or not all(
+            isinstance(count, int) and count > 0 for count in self.pool_quotas.values()
+        ):
+            raise ValidationError({"pool_quotas": 'Use {"category": count} with positive counts.'})
+        if self.pool_size and sum(self.pool_quotas.values()) > self.pool_size:
+            raise ValidationError({"pool_quotas": "Quotas add up to more than the pool size."})
+
+    # Questions served per attempt, as compiled into the cached answer key
+    @cached_property
+    def attempt_size(self):
+        from .answer_key import get_answer_key
+        return get_answer_key(self)["attempt_size"]
+
 # Questions for Quizzes
 class Question(models.Model):
     QUESTION_TYPES = (
@@ -21,6 +45,8 @@ class Question(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="questions")
     text = models.CharField(max_length=500)
     question_type = models.CharField(max_length=10, choices=QUESTION_TYPES, default="MCQ")
+    # Used by Quiz.pool_quotas
+    category = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -43,19 +69,114 @@ class UserSubmission(models.Model):
     score = models.IntegerField(default=0)
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's history on (submitted_at, id)
+            models.Index(fields=["user", "-submitted_at", "-id"], name="quiz_sub_user_recent_idx"),
+            # Per-quiz score lookups (leaderboard rebuild, histograms)
+            models.Index(fields=["quiz", "score"], name="quiz_sub_quiz_score_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user_name} — {self.quiz.title} ({self.score})"
 
 # Individual User Answers
 class UserAnswer(models.Model):
-    submission = models.ForeignKey(UserSubmission, on_delete=models.CASCADE, related_name="user_answers")
+    # Indexed through the leading column of quiz_ua_sub_question_idx
+    submission = models.ForeignKey(UserSubmission, on_delete=models.CASCADE, related_name="user_answers", db_index=False)
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     answer = models.TextField()
     is_correct = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["submission", "question"], name="quiz_ua_sub_question_idx"),
+        ]
+
     def __str__(self):
         return f"{self.submission.user_name} — Q:{self.question.id} {'✔' if self.is_correct else '✖'}"
 
+# Per-user, per-quiz running totals (kept in step with submissions)
+class UserQuizStats(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="quiz_stats")
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="user_stats")
+    attempts_count = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveIntegerField(default=0)
+    best_score = models.IntegerField(default=0)
+    last_attempt_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "quiz")
+
+    @property
+    def average_score(self):
+        return self.score_sum / self.attempts_count if self.attempts_count else 0
+
+    def __str__(self):
+        return f"{self.user.username} — {self.quiz.title} ({self.attempts_count} attempts)"
+
+# Bounded top-N of each quiz: one row per user holding their best score
+class LeaderboardEntry(models.Model):
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="leaderboard")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="leaderboard_entries")
+    best_score = models.IntegerField()
+    achieved_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("quiz", "user")
+        indexes = [
+            models.Index(fields=["quiz", "-best_score", "achieved_at"], name="quiz_leaderboard_rank_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.quiz.title} — {self.user.username} ({self.best_score})"
+
+# Score distribution of a quiz: how many submissions got each score
+class ScoreBucket(models.Model):
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="score_buckets")
+    score = models.IntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("quiz", "score")
+
+    def __str__(self):
+        return f"{self.quiz.title} — score {self.score}: {self.count}"
+
+# Item-analysis high-water mark of a quiz: submissions up to
+# last_submission_id are folded into its QuestionAnalysis rows. Ids are
+# assigned before commit, so submissions made since rescan_from are scanned
+# again and recent_submission_ids (those already folded in) skipped.
+class ItemAnalysis(models.Model):
+    quiz = models.OneToOneField(Quiz, on_delete=models.CASCADE, related_name="item_analysis")
+    last_submission_id = models.BigIntegerField(default=0)
+    rescan_from = models.DateTimeField(null=True, blank=True)
+    recent_submission_ids = models.JSONField(default=list, blank=True)
+    submissions_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.quiz.title} — {self.submissions_count} submissions analysed"
+
+# Per-question item statistics. The sums are additive, so new submissions are
+# folded in without rereading old ones; difficulty and discrimination are
+# derived from them on every refresh.
+class QuestionAnalysis(models.Model):
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="question_analyses")
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name="analysis")
+    responses = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+    total_sum = models.BigIntegerField(default=0)
+    total_sq_sum = models.BigIntegerField(default=0)
+    correct_total_sum = models.BigIntegerField(default=0)
+    # Wrong answers given, {answer text: count}
+    distractors = models.JSONField(default=dict)
+    difficulty = models.FloatField(null=True)
+    discrimination = models.FloatField(null=True)
+
+    def __str__(self):
+        return f"{self.question} — p={self.difficulty}"
+
 # Events Model
 class Event(models.Model):
     title = models.CharField(max_length=200)
@@ -63,6 +184,12 @@ class Event(models.Model):
     location = models.CharField(max_length=200, blank=True)
     description = models.TextField(blank=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="created_events", null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["date"], name="quiz_event_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} — {self.date}"
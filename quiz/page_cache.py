@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+FRAGMENT_TIMEOUT = getattr(settings, "QUIZ_FRAGMENT_CACHE_TIMEOUT", 60 * 60)
+REBUILD_LOCK_TIMEOUT = 30
+REBUILD_WAIT_SECONDS = 2.0
+GENERATION_KEY = "quiz:listing_generation"
+
+
+# Quiz/Event listings share one generation counter; saving or deleting a
+# Quiz or Event bumps it and every cached listing fragment becomes stale.
+def listing_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def bump_listing_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 1, None)
+
+
+# Return the HTML of a listing fragment, calling render() only when the cached
+# copy is missing or stale. Entries are stored as (generation, html) so a
+# stale copy can still be served: when a bump invalidates a busy page, the
+# one request holding the rebuild lock renders while the others keep
+# getting the previous HTML instead of all hitting the database at once.
+def cached_fragment(name, access_mask, render):
+    key = f"quiz:fragment:{name}:{access_mask}"
+    generation = listing_generation()
+
+    entry = cache.get(key)
+    if entry is not None and entry[0] == generation:
+        return entry[1]
+
+    lock_key = f"{key}:rebuild"
+    if cache.add(lock_key, 1, REBUILD_LOCK_TIMEOUT):
+        try:
+            html = render()
+            cache.set(key, (generation, html), FRAGMENT_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return html
+
+    if entry is not None:
+        return entry[1]
+
+    # Nothing to fall back on: give the rebuilding request a moment
+    deadline = time.monotonic() + REBUILD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+    return render()
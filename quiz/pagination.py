@@ -0,0 +1,84 @@
+import base64
+
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+# Opaque cursor for a (submitted_at, id) position, safe to put in a URL
+def encode_cursor(submitted_at, pk):
+    raw = f"{submitted_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        stamp, pk = raw.rsplit("|", 1)
+        submitted_at = parse_datetime(stamp)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if submitted_at is None:
+        raise ValueError("Invalid cursor")
+    return submitted_at, pk
+
+
+# Newest-first keyset page: seeks past the cursor with an index range scan
+# instead of OFFSET, so every page costs the same. Returns the rows and the
+# cursor for the next page (None on the last one).
+def keyset_page(queryset, cursor=None, page_size=20):
+    queryset = queryset.order_by("-submitted_at", "-id")
+    if cursor:
+        submitted_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(submitted_at__lt=submitted_at) | Q(submitted_at=submitted_at, id__lt=pk)
+        )
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].submitted_at, rows[-1].id)
+    return rows, next_cursor
+
+
+# Row count from planner statistics instead of COUNT(*): pg_class.reltuples
+# on PostgreSQL, sqlite_stat1 on SQLite (kept by ANALYZE / PRAGMA optimize).
+# None when no statistics are available.
+def estimated_row_count(model):
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        elif connection.vendor == "sqlite":
+            try:
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            except DatabaseError:
+                return None
+        else:
+            return None
+        row = cursor.fetchone()
+
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+# Admin paginator for very large tables: an unfiltered changelist takes its
+# total from estimated_row_count() once the table is past
+# ESTIMATE_THRESHOLD rows; filtered or small ones still COUNT(*).
+class EstimatedCountPaginator(Paginator):
+    ESTIMATE_THRESHOLD = 100_000
+
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        if isinstance(object_list, QuerySet) and not object_list.query.where:
+            estimate = estimated_row_count(object_list.model)
+            if estimate is not None and estimate >= self.ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
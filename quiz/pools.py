@@ -0,0 +1,93 @@
+import random
+
+from django.core.signing import BadSignature, Signer
+
+
+# Compile a quiz's pool settings against its ordered question list into
+# (count, member indexes) groups: one per category quota, then one for the
+# remaining places drawn from every other question. A quota larger than its
+# category is filled from the other questions, with or without pool_size.
+# None means no pool.
+def compile_pool(quiz, questions):
+    quotas = quiz.pool_quotas or {}
+    if not quiz.pool_size and not quotas:
+        return None
+
+    by_category = {}
+    for index, q in enumerate(questions):
+        by_category.setdefault(q["category"], []).append(index)
+
+    groups = []
+    for category, count in quotas.items():
+        members = tuple(by_category.get(category, ()))
+        groups.append((min(int(count), len(members)), members))
+
+    quota_total = sum(count for count, _ in groups)
+    rest = tuple(sorted(
+        index for category, members in by_category.items() if category not in quotas for index in members
+    ))
+    size = quiz.pool_size or sum(int(count) for count in quotas.values())
+    groups.append((max(0, min(len(rest), size - quota_total)), rest))
+
+    return tuple(group for group in groups if group[0])
+
+
+# Questions served per attempt (the denominator of every score)
+def attempt_size(questions, pool):
+    return sum(count for count, _ in pool) if pool else len(questions)
+
+
+# Draw one attempt's questions: random.sample() on each group's cached
+# index tuple, so the work is proportional to the pool, not the bank.
+def draw_questions(answer_key, rng=random):
+    questions = answer_key["questions"]
+    picked = sorted(index for count, members in answer_key["pool"] for index in rng.sample(members, count))
+    return [questions[index] for index in picked]
+
+
+def _signer(quiz_id):
+    return Signer(salt=f"quiz.pool:{quiz_id}")
+
+
+# The served question ids travel with the attempt form as a signed,
+# delta-encoded base-36 list ("1a.3.f" ...), so the POST grades exactly
+# what was shown without storing anything server-side.
+def sign_served(quiz_id, questions):
+    ids = sorted(q["id"] for q in questions)
+    deltas = [current - previous for previous, current in zip([0] + ids, ids)]
+    return _signer(quiz_id).sign(".".join(_base36(delta) for delta in deltas))
+
+
+def served_questions(answer_key, token):
+    payload = _signer(answer_key["quiz_id"]).unsign(token)
+    served, current = set(), 0
+    try:
+        for part in filter(None, payload.split(".")):
+            current += int(part, 36)
+            served.add(current)
+    except ValueError:
+        raise BadSignature("Malformed question set")
+    # Questions deleted since the page was served are simply left out
+    return [q for q in answer_key["questions"] if q["id"] in served]
+
+
+# Questions for an attempt and the token to embed in its form. Without a
+# pool every question is served and no token is needed; with one, a GET
+# (token None) draws a fresh set and a POST must present its token.
+def attempt_questions(answer_key, token=None):
+    if not answer_key["pool"]:
+        return answer_key["questions"], None
+    if token is None:
+        questions = draw_questions(answer_key)
+        return questions, sign_served(answer_key["quiz_id"], questions)
+    return served_questions(answer_key, token), token
+
+
+def _base36(number):
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        number, rem = divmod(number, 36)
+        out = digits[rem] + out
+        if not number:
+            return out
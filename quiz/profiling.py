@@ -0,0 +1,90 @@
+import json
+import os
+import pstats
+import re
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+PROFILE_NAME_RE = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+
+def profile_dir():
+    path = Path(getattr(settings, "QUIZ_PROFILE_DIR", None) or Path(tempfile.gettempdir()) / "quiz_profiles")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# Save a finished cProfile run plus a small JSON sidecar describing the
+# request, then trim the directory to the newest QUIZ_PROFILE_MAX_FILES runs.
+def save_profile(profiler, request, response, elapsed, reason):
+    directory = profile_dir()
+    name = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(directory / f"{name}.prof")
+
+    match = getattr(request, "resolver_match", None)
+    meta = {
+        "name": name,
+        "path": request.get_full_path(),
+        "method": request.method,
+        "view": match.view_name if match else None,
+        "status": response.status_code,
+        "user": request.user.get_username() if getattr(request, "user", None) and request.user.is_authenticated else None,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "reason": reason,
+        "created": time.time(),
+    }
+    (directory / f"{name}.json").write_text(json.dumps(meta))
+
+    trim_profiles(directory, getattr(settings, "QUIZ_PROFILE_MAX_FILES", 50))
+    return name
+
+
+def trim_profiles(directory, keep):
+    names = sorted(p.stem for p in directory.glob("*.prof"))
+    for name in names[:max(len(names) - keep, 0)]:
+        for suffix in (".prof", ".json"):
+            try:
+                os.remove(directory / f"{name}{suffix}")
+            except FileNotFoundError:
+                pass
+
+
+# Newest first
+def list_profiles():
+    profiles = []
+    for meta_path in sorted(profile_dir().glob("*.json"), reverse=True):
+        try:
+            profiles.append(json.loads(meta_path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+# Metadata and the `limit` functions with the highest cumulative time, or
+# None if the profile does not exist (or has been rotated out).
+def load_profile(name, limit=40):
+    if not PROFILE_NAME_RE.match(name):
+        return None
+    directory = profile_dir()
+    try:
+        meta = json.loads((directory / f"{name}.json").read_text())
+        stats = pstats.Stats(str(directory / f"{name}.prof"))
+    except (OSError, ValueError):
+        return None
+
+    rows = []
+    for (filename, line, function), (cc, nc, tt, ct, _callers) in stats.stats.items():
+        rows.append({
+            "function": function,
+            "location": f"{filename}:{line}",
+            "calls": nc,
+            "primitive_calls": cc,
+            "total_ms": tt * 1000,
+            "cumulative_ms": ct * 1000,
+        })
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return meta, rows[:limit]
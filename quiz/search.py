@@ -0,0 +1,138 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Question, Quiz
+
+SEARCH_LIMIT = 50
+# Question hits count for less than a hit on the quiz itself
+QUESTION_WEIGHT = 0.5
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# The FTS5 tables exist on SQLite only (migrations 0014 and 0018)
+def fts_enabled():
+    return connection.vendor == "sqlite"
+
+
+# INDEX MAINTENANCE
+# The index tables hold their own copy of the text and are written from
+# model signals and from the bulk loaders, which skip signals. Triggers on
+# quiz_quiz/quiz_question would not do: SQLite migrations that alter those
+# tables rebuild them and silently drop their triggers.
+INDEX_COLUMNS = {
+    "quiz_search_quiz": ("title", "description"),
+    "quiz_search_question": ("text",),
+}
+
+
+def _write_index(index, rows):
+    if not fts_enabled() or not rows:
+        return
+    columns = INDEX_COLUMNS[index]
+    placeholders = ", ".join(["%s"] * (len(columns) + 1))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {index}(rowid, {', '.join(columns)}) VALUES ({placeholders})", rows
+        )
+
+
+def index_quizzes(quizzes):
+    _write_index("quiz_search_quiz", [(q.pk, q.title, q.description) for q in quizzes])
+
+
+def index_questions(questions):
+    _write_index("quiz_search_question", [(q.pk, q.text) for q in questions])
+
+
+def unindex(index, ids):
+    if not fts_enabled() or not ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {index} WHERE rowid = %s", [(pk,) for pk in ids])
+
+
+# Drop the question rows of a quiz about to be deleted in one statement
+def unindex_quiz_questions(quiz_id):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM quiz_search_question WHERE rowid IN (SELECT id FROM quiz_question WHERE quiz_id = %s)",
+            [quiz_id],
+        )
+
+
+# Turn free text into a safe FTS5 query: every word must match, and the
+# last one may be a prefix ("photo" finds "photosynthesis" while typing).
+def fts_query(text):
+    terms = _TERM_RE.findall(text or "")
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " AND ".join(quoted)
+
+
+# Subquery of ids matching the index, for QuerySet.filter(id__in=...)
+def matching_ids(index, text):
+    return RawSQL(f"SELECT rowid FROM {index} WHERE {index} MATCH %s", [fts_query(text)])
+
+
+# Quizzes ranked by bm25 relevance: a quiz scores by its best hit, either
+# its own title/description or one of its questions.
+def search_quizzes(text, limit=SEARCH_LIMIT):
+    query = fts_query(text)
+    if query is None:
+        return []
+    if not fts_enabled():
+        return list(
+            Quiz.objects.filter(is_published=True)
+            .filter(Q(title__icontains=text) | Q(questions__text__icontains=text))
+            .distinct().order_by("-created_at")[:limit]
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT quiz_id FROM (
+                SELECT rowid AS quiz_id, bm25(quiz_search_quiz, 10.0, 1.0) AS rank
+                FROM quiz_search_quiz WHERE quiz_search_quiz MATCH %s
+                UNION ALL
+                SELECT question.quiz_id, bm25(quiz_search_question) * %s
+                FROM quiz_search_question
+                JOIN quiz_question AS question ON question.id = quiz_search_question.rowid
+                WHERE quiz_search_question MATCH %s
+            )
+            GROUP BY quiz_id ORDER BY MIN(rank) LIMIT %s
+            """,
+            [query, QUESTION_WEIGHT, query, limit],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+
+    quizzes = Quiz.objects.filter(is_published=True).in_bulk(ids)
+    return [quizzes[pk] for pk in ids if pk in quizzes]
+
+
+# Questions ranked by bm25 relevance, with their quiz
+def search_questions(text, limit=SEARCH_LIMIT):
+    query = fts_query(text)
+    if query is None:
+        return []
+    questions = Question.objects.filter(quiz__is_published=True).select_related("quiz")
+    if not fts_enabled():
+        return list(questions.filter(text__icontains=text).order_by("quiz_id", "id")[:limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid FROM quiz_search_question WHERE quiz_search_question MATCH %s "
+            "ORDER BY rank LIMIT %s",
+            [query, limit],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+
+    found = questions.in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .access import invalidate_access
+from .answer_key import touch_quiz
+from .models import Quiz, Question, Answer, Event, UserProfile
+from .page_cache import bump_listing_generation
+from .search import index_questions, index_quizzes, unindex, unindex_quiz_questions
+
+
+# QUIZ/EVENT CHANGES: cached listing fragments are stale
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def listing_changed(sender, **kwargs):
+    bump_listing_generation()
+
+
+# Remember which quiz an existing question belonged to, so a save that
+# moves it (e.g. in QuestionAdmin) can fix up both quizzes
+@receiver(pre_save, sender=Question)
+def question_moving(sender, instance, **kwargs):
+    instance._previous_quiz_id = None
+    if instance.pk is not None:
+        instance._previous_quiz_id = (
+            Question.objects.filter(pk=instance.pk).values_list("quiz_id", flat=True).first()
+        )
+
+
+# QUESTION CHANGES (including admin inlines). Raw saves (loaddata) keep the
+# count right but leave the fixture's updated_at alone.
+@receiver(post_save, sender=Question)
+def question_saved(sender, instance, created, raw=False, **kwargs):
+    previous_quiz_id = getattr(instance, "_previous_quiz_id", None)
+    moved = not created and previous_quiz_id is not None and previous_quiz_id != instance.quiz_id
+
+    if created or moved:
+        updates = {"question_count": F("question_count") + 1}
+        if not raw:
+            updates["updated_at"] = timezone.now()
+        Quiz.objects.filter(pk=instance.quiz_id).update(**updates)
+        if moved:
+            updates["question_count"] = F("question_count") - 1
+            Quiz.objects.filter(pk=previous_quiz_id, question_count__gt=0).update(**updates)
+        bump_listing_generation()  # quiz cards show the count
+    elif not raw:
+        touch_quiz(instance.quiz_id)
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Quiz):
+        return  # the quiz itself is being deleted
+    Quiz.objects.filter(pk=instance.quiz_id, question_count__gt=0).update(
+        updated_at=timezone.now(),
+        question_count=F("question_count") - 1,
+    )
+    bump_listing_generation()
+
+
+# ANSWER CHANGES (including admin inlines)
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def answer_changed(sender, instance, origin=None, raw=False, **kwargs):
+    if raw or isinstance(origin, (Quiz, Question)):
+        return  # fixture load, or covered by the question/quiz delete
+    Quiz.objects.filter(questions=instance.question_id).update(updated_at=timezone.now())
+
+
+# SEARCH INDEX: mirror title/description/text edits into the FTS tables.
+# Raw saves are indexed too, so loaddata'd quizzes are searchable.
+@receiver(post_save, sender=Quiz)
+def quiz_indexed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {"title", "description"} & set(update_fields):
+        index_quizzes([instance])
+
+
+@receiver(pre_delete, sender=Quiz)
+def quiz_unindexed(sender, instance, **kwargs):
+    unindex_quiz_questions(instance.pk)
+    unindex("quiz_search_quiz", [instance.pk])
+
+
+@receiver(post_save, sender=Question)
+def question_indexed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "text" in update_fields:
+        index_questions([instance])
+
+
+@receiver(post_delete, sender=Question)
+def question_unindexed(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Quiz):
+        return  # dropped with the quiz in quiz_unindexed()
+    unindex("quiz_search_question", [instance.pk])
+
+
+# PROFILE CHANGES: drop the cached access bitmask
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def profile_changed(sender, instance, **kwargs):
+    invalidate_access(instance.user_id)
+
+
+# SQLITE TUNING: apply QUIZ_SQLITE_PRAGMAS to each new connection
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    pragmas = getattr(settings, "QUIZ_SQLITE_PRAGMAS", None)
+    if connection.vendor != "sqlite" or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
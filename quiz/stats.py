@@ -0,0 +1,75 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Sum, Value
+from django.db.models.functions import Greatest
+
+from .models import UserQuizStats, UserSubmission
+
+
+# Fold one submission into the user's running totals for that quiz. The
+# UPDATE uses F()/GREATEST so concurrent submissions never lose an attempt;
+# the first attempt inserts the row instead.
+def record_attempt(submission):
+    if submission.user_id is None:
+        return
+
+    lookup = {"user_id": submission.user_id, "quiz_id": submission.quiz_id}
+    updates = {
+        "attempts_count": F("attempts_count") + 1,
+        "score_sum": F("score_sum") + submission.score,
+        "best_score": Greatest("best_score", Value(submission.score)),
+        "last_attempt_at": Greatest("last_attempt_at", Value(submission.submitted_at)),
+    }
+
+    if UserQuizStats.objects.filter(**lookup).update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            UserQuizStats.objects.create(
+                **lookup,
+                attempts_count=1,
+                score_sum=submission.score,
+                best_score=submission.score,
+                last_attempt_at=submission.submitted_at,
+            )
+    except IntegrityError:
+        # Another request created the row first
+        UserQuizStats.objects.filter(**lookup).update(**updates)
+
+
+# Recompute every row from UserSubmission (used by backfill_quiz_stats).
+def rebuild_quiz_stats(batch_size=1000):
+    totals = (
+        UserSubmission.objects
+        .filter(user__isnull=False)
+        .values("user_id", "quiz_id")
+        .annotate(
+            attempts=Count("id"),
+            total=Sum("score"),
+            best=Max("score"),
+            last=Max("submitted_at"),
+        )
+        .order_by()
+    )
+
+    created = 0
+    with transaction.atomic():
+        UserQuizStats.objects.all().delete()
+        batch = []
+        for row in totals.iterator(chunk_size=batch_size):
+            batch.append(UserQuizStats(
+                user_id=row["user_id"],
+                quiz_id=row["quiz_id"],
+                attempts_count=row["attempts"],
+                score_sum=row["total"] or 0,
+                best_score=row["best"] or 0,
+                last_attempt_at=row["last"],
+            ))
+            if len(batch) >= batch_size:
+                UserQuizStats.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        UserQuizStats.objects.bulk_create(batch)
+        created += len(batch)
+
+    return created
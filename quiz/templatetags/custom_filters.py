@@ -5,3 +5,10 @@ register = template.Library()
 @register.filter
 def get_item(dictionary, key):
     return dictionary.get(key)
+
+
+@register.filter
+def percentage(value, total):
+    if not total:
+        return 0
+    return value * 100 / total
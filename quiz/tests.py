@@ -1,3 +1,1002 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from .access import load_access
+from .analytics import _chunk_sums, _derive, refresh_item_analysis
+from .answer_key import get_answer_key
+from .authoring import create_questions
+from .benchmarks import QUERY_BUDGETS, attempt_post_data, build_dataset, create_quiz_payload, scenarios
+from .export import iter_columnar, iter_csv, read_columnar
+from .grading import grade_submission, record_submissions
+from .histogram import get_histogram, percentile_rank, rebuild_histograms
+from .leaderboard import get_leaderboard, rebuild_leaderboard
+from .pools import attempt_questions
+from .profiling import list_profiles
+from .instrumentation import rolling_stats
+from .search import search_questions, search_quizzes
+from .pagination import decode_cursor, encode_cursor, estimated_row_count, keyset_page
+from .text_match import compile_accepted, text_matches, within_edits
+from .writebehind import SubmissionWriter, get_pending
+from .models import (
+    Answer, Event, LeaderboardEntry, Question, QuestionAnalysis, Quiz, ScoreBucket,
+    UserAnswer, UserProfile, UserQuizStats, UserSubmission,
+)
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = build_dataset(quizzes=3, questions=15, answers=4, submissions=30, events=5)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.dataset["user"])
+
+    def count_queries(self, request):
+        with CaptureQueriesContext(connection) as ctx:
+            response = request(self.client)
+        self.assertLess(response.status_code, 400)
+        return len(ctx.captured_queries)
+
+    def test_views_stay_within_query_budgets(self):
+        for name, request in scenarios(self.dataset):
+            with self.subTest(view=name):
+                request(self.client)  # warm the caches
+                used = self.count_queries(request)
+                self.assertLessEqual(used, QUERY_BUDGETS[name], f"{name} ran {used} queries")
+
+    def test_attempt_queries_do_not_grow_with_quiz_size(self):
+        small = self.dataset["quizzes"][0]
+        big = build_dataset(quizzes=1, questions=60, submissions=0, events=0, username="bench-big")["quizzes"][0]
+        self.client.force_login(self.dataset["user"])
+
+        counts = {}
+        for quiz in (small, big):
+            data = attempt_post_data(quiz)
+            self.client.get(f"/quiz/{quiz.id}/")
+            self.client.post(f"/quiz/{quiz.id}/", data)  # first attempt creates the stats row
+            counts[quiz.id] = (
+                self.count_queries(lambda c: c.get(f"/quiz/{quiz.id}/")),
+                self.count_queries(lambda c: c.post(f"/quiz/{quiz.id}/", data)),
+            )
+        self.assertEqual(counts[small.id], counts[big.id])
+
+    def test_history_queries_do_not_grow_with_submissions(self):
+        self.client.get("/history/")
+        first = self.count_queries(lambda c: c.get("/history/"))
+        quiz = Quiz.objects.get(pk=self.dataset["quizzes"][1].pk)
+        data = attempt_post_data(quiz)
+        for _ in range(10):
+            self.client.post(f"/quiz/{quiz.id}/", data)
+        self.assertEqual(self.count_queries(lambda c: c.get("/history/")), first)
+
+
+# Tables that grow with usage; a full SCAN of one of them is a regression
+LARGE_TABLES = {
+    model._meta.db_table
+    for model in (Question, Answer, UserSubmission, UserAnswer, UserQuizStats,
+                  LeaderboardEntry, ScoreBucket, QuestionAnalysis)
+}
+ALIAS_RE = re.compile(r'"(\w+)" (U\d+)\b')
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite syntax")
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = build_dataset(quizzes=3, questions=15, answers=4, submissions=30, events=5)
+        cls.quiz = cls.dataset["quizzes"][0]
+        cls.quiz.created_by = cls.dataset["user"]
+        cls.quiz.save()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.dataset["user"])
+
+    def plan_scenarios(self):
+        quiz = self.quiz
+        submission = UserSubmission.objects.filter(quiz=quiz).first()
+        return scenarios(self.dataset) + [
+            ("quiz_result", lambda c: c.get(f"/result/{submission.id}/")),
+            ("quiz_leaderboard", lambda c: c.get(f"/quiz/{quiz.id}/leaderboard/")),
+            ("quiz_history_json", lambda c: c.get("/history/json/")),
+            ("api_quiz", lambda c: c.get(f"/api/quiz/{quiz.id}/")),
+            ("api_quiz_distribution", lambda c: c.get(f"/api/quiz/{quiz.id}/distribution/")),
+            ("quiz_search", lambda c: c.get("/quizzes/search/?q=question")),
+            ("dashboard", lambda c: c.get("/dashboard/")),
+            ("quiz_analysis", lambda c: c.get(f"/dashboard/quiz/{quiz.id}/analysis/")),
+            ("export_submissions", lambda c: b"".join(c.get(f"/dashboard/quiz/{quiz.id}/export/").streaming_content)),
+        ]
+
+    # Tables read with a full scan by one captured statement
+    def scanned_tables(self, sql):
+        aliases = {alias: table for table, alias in ALIAS_RE.findall(sql)}
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            details = [row[-1] for row in cursor.fetchall()]
+        scanned = set()
+        for detail in details:
+            match = re.match(r"SCAN (\w+)", detail)
+            if match:
+                scanned.add(aliases.get(match.group(1), match.group(1)))
+        return scanned
+
+    def test_view_queries_do_not_scan_large_tables(self):
+        for name, request in self.plan_scenarios():
+            with self.subTest(view=name):
+                with CaptureQueriesContext(connection) as ctx:
+                    request(self.client)
+                for query in ctx.captured_queries:
+                    sql = query["sql"]
+                    if not sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                        continue
+                    full_scans = self.scanned_tables(sql) & LARGE_TABLES
+                    self.assertFalse(full_scans, f"{name} scans {sorted(full_scans)}: {sql}")
+
+
+class GradeSubmissionTests(SimpleTestCase):
+    questions = [
+        {"id": 1, "question_type": "MCQ", "choices": {"10": "Paris", "11": "Rome"}, "correct_ids": frozenset({"10"})},
+        {"id": 2, "question_type": "MCQ", "choices": {"20": "2", "21": "4"}, "correct_ids": frozenset({"21"})},
+        {"id": 3, "question_type": "TEXT", "accepted": compile_accepted(["Photosynthesis"])},
+    ]
+
+    def test_mcq_correct_wrong_and_missing(self):
+        score, graded = grade_submission(self.questions, {"question_1": "10", "question_2": "20"})
+        self.assertEqual(score, 1)
+        self.assertEqual(graded[:2], [(1, "Paris", True), (2, "2", False)])
+        self.assertEqual(graded[2], (3, "", False))
+
+        score, graded = grade_submission(self.questions, {})
+        self.assertEqual(score, 0)
+        self.assertEqual([g[1] for g in graded], ["No answer", "No answer", ""])
+
+    def test_unknown_choice_is_not_correct(self):
+        _, graded = grade_submission(self.questions, {"question_1": "999"})
+        self.assertEqual(graded[0], (1, "No answer", False))
+
+    def test_text_answers(self):
+        score, graded = grade_submission(self.questions, {"question_3": "  photosynthesis "})
+        self.assertEqual((score, graded[2]), (1, (3, "  photosynthesis ", True)))
+        self.assertFalse(grade_submission(self.questions, {"question_3": "respiration"})[1][2][2])
+
+
+class TextMatchTests(SimpleTestCase):
+    def test_numeric_tolerance_syntax(self):
+        for accepted in ("9.81 ± 0.05", "9.81 +/- 0.05", "9.81+-0.05"):
+            compiled = compile_accepted([accepted])
+            self.assertTrue(text_matches(compiled, "9.86"), accepted)
+            self.assertTrue(text_matches(compiled, " 9.76 "), accepted)
+            self.assertFalse(text_matches(compiled, "9.87"), accepted)
+
+    def test_numbers_default_to_exact(self):
+        compiled = compile_accepted(["3"])
+        self.assertTrue(text_matches(compiled, "3.0"))
+        self.assertFalse(text_matches(compiled, "3.01"))
+        self.assertFalse(text_matches(compiled, "nan"))
+
+    def test_accents_case_and_punctuation_are_ignored(self):
+        compiled = compile_accepted(["São Paulo"])
+        self.assertTrue(text_matches(compiled, "sao paulo!"))
+        self.assertTrue(text_matches(compile_accepted(["cafe"]), "CAFÉ"))
+        self.assertFalse(text_matches(compiled, "  "))
+
+    def test_edit_bounds_scale_with_length(self):
+        self.assertFalse(text_matches(compile_accepted(["cat"]), "cab"))
+        self.assertTrue(text_matches(compile_accepted(["paris"]), "pariss"))
+        self.assertFalse(text_matches(compile_accepted(["paris"]), "parxx"))
+        self.assertTrue(text_matches(compile_accepted(["photosynthesis"]), "fotosynthesis"))
+        self.assertFalse(text_matches(compile_accepted(["photosynthesis"]), "fotosinthesis"))
+
+    @mock.patch("quiz.text_match.MAX_EDITS", 0)
+    def test_max_edits_zero_turns_fuzzy_matching_off(self):
+        compiled = compile_accepted(["photosynthesis"])
+        self.assertFalse(text_matches(compiled, "photosynthesys"))
+        self.assertTrue(text_matches(compiled, "Photosynthesis"))
+
+    def test_within_edits_agrees_with_full_levenshtein(self):
+        def levenshtein(a, b):
+            previous = list(range(len(b) + 1))
+            for i, ca in enumerate(a, start=1):
+                current = [i]
+                for j, cb in enumerate(b, start=1):
+                    current.append(min(previous[j - 1] + (ca != cb), previous[j] + 1, current[j - 1] + 1))
+                previous = current
+            return previous[-1]
+
+        words = ["", "a", "ab", "ba", "abc", "acb", "kitten", "sitting", "mitten", "sittin", "kitchen"]
+        for a in words:
+            for b in words:
+                for limit in (1, 2):
+                    self.assertEqual(within_edits(a, b, limit), levenshtein(a, b) <= limit, (a, b, limit))
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("author", is_staff=True)
+        self.client.force_login(self.user)
+
+    def post(self, body):
+        return self.client.post("/quizzes/create-quiz/", body, content_type="application/json")
+
+    def test_draft_is_published_by_the_final_chunk(self):
+        questions = json.loads(create_quiz_payload(questions=4))["questions"]
+        first = self.post({"title": "Big", "questions": questions[:2], "final": False}).json()
+        quiz = Quiz.objects.get(pk=first["quiz_id"])
+        self.assertFalse(quiz.is_published)
+        self.assertEqual(self.client.get(f"/quiz/{quiz.id}/").status_code, 404)
+
+        response = self.post({"quiz_id": quiz.id, "offset": 2, "questions": questions[2:], "final": True})
+        self.assertEqual(response.status_code, 200)
+        quiz.refresh_from_db()
+        self.assertTrue(quiz.is_published)
+        self.assertEqual(quiz.question_count, 4)
+
+    def test_rejected_chunk_discards_the_draft(self):
+        questions = json.loads(create_quiz_payload(questions=2))["questions"]
+        quiz_id = self.post({"title": "Big", "questions": questions, "final": False}).json()["quiz_id"]
+        response = self.post({"quiz_id": quiz_id, "offset": 2, "questions": [{"text": "", "answers": []}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Quiz.objects.filter(pk=quiz_id).exists())
+
+    def test_bad_offset_is_a_bad_request(self):
+        questions = json.loads(create_quiz_payload(questions=2))["questions"]
+        quiz_id = self.post({"title": "Big", "questions": questions, "final": False}).json()["quiz_id"]
+        response = self.post({"quiz_id": quiz_id, "offset": "two", "questions": questions})
+        self.assertEqual(response.status_code, 400)
+
+    def test_published_quizzes_cannot_be_appended_to(self):
+        questions = json.loads(create_quiz_payload(questions=2))["questions"]
+        quiz_id = self.post({"title": "Small", "questions": questions}).json()["quiz_id"]
+        self.assertTrue(Quiz.objects.get(pk=quiz_id).is_published)
+        self.assertEqual(self.post({"quiz_id": quiz_id, "offset": 2, "questions": questions}).status_code, 404)
+
+
+class ImportQuizzesTests(TestCase):
+    fixture_path = "quiz/fixtures/quiz_data.json"
+
+    def snapshot(self):
+        return (
+            list(Quiz.objects.order_by("id").values_list(
+                "id", "title", "description", "created_at", "updated_at", "question_count")),
+            list(Question.objects.order_by("id").values_list("id", "quiz_id", "text", "question_type", "created_at")),
+            list(Answer.objects.order_by("id").values_list("id", "question_id", "text", "is_correct")),
+        )
+
+    def test_import_matches_loaddata(self):
+        call_command("import_quizzes", self.fixture_path, "--batch-size", "50", stdout=io.StringIO())
+        imported = self.snapshot()
+        Quiz.objects.all().delete()
+
+        call_command("loaddata", self.fixture_path, verbosity=0)
+        self.assertEqual(imported, self.snapshot())
+        self.assertEqual(str(imported[0][0][3].date()), "2025-01-01")
+
+
+class ImportPayloadTests(TestCase):
+    def run_import(self, payload, *args):
+        path = os.path.join(self.tmp, "payload.json")
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(payload, fp)
+        call_command("import_quizzes", path, *args, stdout=io.StringIO())
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def test_payload_is_published_after_the_last_batch(self):
+        self.run_import(json.loads(create_quiz_payload(questions=7)), "--batch-size", "2",
+                        "--batches-per-transaction", "1")
+        quiz = Quiz.objects.get(title="Benchmark quiz")
+        self.assertTrue(quiz.is_published)
+        self.assertEqual(quiz.question_count, 7)
+
+    def test_failed_batch_deletes_the_draft(self):
+        payload = json.loads(create_quiz_payload(questions=6))
+        payload["questions"][5]["answers"] = []
+        for extra in ((), ("--batches-per-transaction", "1")):
+            with self.assertRaises(CommandError):
+                self.run_import(payload, "--batch-size", "2", *extra)
+            self.assertFalse(Quiz.objects.exists())
+            self.assertFalse(Question.objects.exists())
+
+    def test_batch_size_applies_to_payload_inserts(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.run_import(json.loads(create_quiz_payload(questions=6)), "--batch-size", "4")
+        inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "quiz_answer"')]
+        self.assertEqual(len(inserts), 3)  # 12 answers, 4 per statement
+
+
+class QuestionCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.source = Quiz.objects.create(title="Source")
+        self.target = Quiz.objects.create(title="Target")
+        self.questions = [Question.objects.create(quiz=self.source, text=f"Q{i}") for i in range(3)]
+        Question.objects.create(quiz=self.target, text="T0")
+
+    def test_moving_a_question_updates_both_quizzes(self):
+        get_answer_key(Quiz.objects.get(pk=self.source.pk))  # cache the old version
+        moved = Question.objects.get(pk=self.questions[0].pk)
+        moved.quiz = self.target
+        moved.save()
+
+        source = Quiz.objects.get(pk=self.source.pk)
+        target = Quiz.objects.get(pk=self.target.pk)
+        self.assertEqual((source.question_count, target.question_count), (2, 2))
+        self.assertNotIn(moved.id, [q["id"] for q in get_answer_key(source)["questions"]])
+        self.assertIn(moved.id, [q["id"] for q in get_answer_key(target)["questions"]])
+
+    def test_editing_in_place_keeps_the_count(self):
+        question = Question.objects.get(pk=self.questions[1].pk)
+        question.text = "Edited"
+        question.save()
+        self.assertEqual(Quiz.objects.get(pk=self.source.pk).question_count, 3)
+
+
+class HistoryPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("student", is_staff=True)
+        UserProfile.objects.create(user=self.user, access_quiz=True)
+        quiz = Quiz.objects.create(title="Quiz")
+        for score in range(7):
+            UserSubmission.objects.create(quiz=quiz, user=self.user, user_name="student", score=score)
+        # Every row shares one timestamp: only the id tie-breaker orders them
+        UserSubmission.objects.update(submitted_at=timezone.now())
+        self.client.force_login(self.user)
+
+    def test_pages_cover_equal_timestamps_exactly_once(self):
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(UserSubmission.objects.all(), cursor, page_size=3)
+            seen += [row.id for row in rows]
+            if cursor is None:
+                break
+        expected = list(UserSubmission.objects.order_by("-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_json_pages_follow_the_cursor(self):
+        first = self.client.get("/history/json/").json()
+        self.assertEqual(len(first["results"]), 7)
+        self.assertIsNone(first["next_cursor"])
+
+        newest = UserSubmission.objects.order_by("-id").first()
+        cursor = encode_cursor(newest.submitted_at, newest.id)
+        rest = self.client.get("/history/json/", {"cursor": cursor}).json()
+        self.assertEqual([r["id"] for r in rest["results"]],
+                         list(UserSubmission.objects.filter(id__lt=newest.id).order_by("-id").values_list("id", flat=True)))
+
+    def test_bad_cursor_is_a_bad_request(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+        self.assertEqual(self.client.get("/history/", {"cursor": "not-a-cursor"}).status_code, 400)
+        self.assertEqual(self.client.get("/history/json/", {"cursor": "!!"}).status_code, 400)
+
+
+class AccessMaskTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("viewer")
+        self.client.force_login(self.user)
+
+    def test_user_without_profile_is_denied(self):
+        self.assertFalse(load_access(self.user).any)
+        self.assertEqual(self.client.get("/quizzes/").status_code, 403)
+        self.assertEqual(self.client.get("/events/").status_code, 403)
+
+    def test_profile_save_invalidates_the_cached_mask(self):
+        profile = UserProfile.objects.create(user=self.user, access_event=True)
+        self.assertEqual(self.client.get("/quizzes/").status_code, 403)
+        self.assertTrue(load_access(self.user).event)
+
+        profile.access_quiz = True
+        profile.save()
+        self.assertTrue(load_access(self.user).quiz)
+        self.assertEqual(self.client.get("/quizzes/").status_code, 200)
+
+        profile.delete()
+        self.assertEqual(load_access(self.user).mask, 0)
+        self.assertEqual(self.client.get("/events/").status_code, 403)
+
+
+# The writer commits its own transactions, so these run outside a test transaction
+class SubmissionWriterTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("student")
+        self.quiz = Quiz.objects.create(title="Quiz")
+        self.question = Question.objects.create(quiz=self.quiz, text="Q")
+        self.writer = SubmissionWriter(batch_size=10)
+        # No background thread: the test drains the queue with flush()
+        self.writer._ensure_started = lambda: None
+
+    def submit(self, question_id):
+        submission = UserSubmission(quiz=self.quiz, user=self.user, user_name="student", score=1)
+        return self.writer.submit(submission, [(question_id, "a", True)], total_questions=1)
+
+    def test_flush_writes_queued_submissions(self):
+        tokens = [self.submit(self.question.id) for _ in range(3)]
+        self.assertEqual(UserSubmission.objects.count(), 0)
+
+        self.writer.flush()
+        ids = [get_pending(token)["submission_id"] for token in tokens]
+        self.assertEqual(sorted(ids), list(UserSubmission.objects.order_by("id").values_list("id", flat=True)))
+        self.assertEqual(UserAnswer.objects.count(), 3)
+        self.assertEqual(UserQuizStats.objects.get(user=self.user, quiz=self.quiz).attempts_count, 3)
+
+    def test_failed_batch_is_retried_one_by_one(self):
+        good = self.submit(self.question.id)
+        bad = self.submit(self.question.id + 1000)  # answer to a missing question
+        with self.assertLogs("quiz.writebehind", "ERROR"):
+            self.writer.flush()
+
+        self.assertEqual(get_pending(good)["submission_id"], UserSubmission.objects.get().id)
+        self.assertIsNone(get_pending(bad)["submission_id"])
+        self.assertTrue(get_pending(bad)["failed"])
+        self.assertEqual(UserAnswer.objects.count(), 1)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("student", is_staff=True)
+        self.client.force_login(self.user)
+        self.quiz = Quiz.objects.create(title="Quiz")
+        self.question = Question.objects.create(quiz=self.quiz, text="Q")
+        Answer.objects.create(question=self.question, text="A", is_correct=True)
+
+    # The ETag covers the CSRF cookie, which the first page view sets
+    def revalidate(self, url):
+        self.client.get(url)
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        return first["ETag"], self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    def test_unchanged_quiz_page_is_not_modified(self):
+        etag, again = self.revalidate(f"/quiz/{self.quiz.id}/")
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], etag)
+
+    def test_question_edit_changes_the_etag(self):
+        url = f"/quiz/{self.quiz.id}/"
+        etag, _ = self.revalidate(url)
+        question = Question.objects.get(pk=self.question.pk)
+        question.text = "Edited"
+        question.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Edited")
+
+    def test_event_detail_revalidates(self):
+        event = Event.objects.create(title="Fair", date=timezone.now().date())
+        url = f"/events/{event.id}/"
+        etag, again = self.revalidate(url)
+        self.assertEqual(again.status_code, 304)
+
+        event.location = "Hall"
+        event.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class QuizApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("student", is_staff=True)
+        self.client.force_login(self.user)
+        self.quiz = Quiz.objects.create(title="Quiz")
+        self.question = Question.objects.create(quiz=self.quiz, text="Q")
+        self.answer = Answer.objects.create(question=self.question, text="A", is_correct=True)
+        self.url = f"/api/quiz/{self.quiz.id}/"
+
+    def test_gzip_and_identity_bodies_have_different_etags(self):
+        plain = self.client.get(self.url)
+        gzipped = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertNotEqual(plain["ETag"], gzipped["ETag"])
+        self.assertIn("Accept-Encoding", gzipped["Vary"])
+
+        # A cached identity body must not validate a gzip request
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=plain["ETag"])
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=gzipped["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def pooled_quiz(self):
+        quiz = Quiz.objects.create(title="Pooled", pool_size=2)
+        for i in range(5):
+            question = Question.objects.create(quiz=quiz, text=f"P{i}")
+            Answer.objects.create(question=question, text="right", is_correct=True)
+            Answer.objects.create(question=question, text="wrong", is_correct=False)
+        return quiz
+
+    def submit(self, quiz, body):
+        return self.client.post(f"/api/quiz/{quiz.id}/submit/", body, content_type="application/json")
+
+    def test_pooled_quiz_grades_the_drawn_questions(self):
+        quiz = self.pooled_quiz()
+        response = self.client.get(f"/api/quiz/{quiz.id}/")
+        self.assertIn("no-store", response["Cache-Control"])
+        self.assertNotIn("ETag", response)
+        document = response.json()
+        self.assertEqual(len(document["questions"]), 2)
+
+        answers = {
+            q["id"]: next(a["id"] for a in q["answers"] if a["text"] == "right") for q in document["questions"]
+        }
+        result = self.submit(quiz, {"answers": answers, "pool": document["pool"]}).json()
+        self.assertEqual((result["score"], result["total_questions"]), (2, 2))
+        self.assertEqual({r["question_id"] for r in result["results"]}, set(answers))
+
+    def test_pooled_submit_needs_a_valid_token(self):
+        quiz = self.pooled_quiz()
+        token = self.client.get(f"/api/quiz/{quiz.id}/").json()["pool"]
+        self.assertEqual(self.submit(quiz, {"answers": {}}).status_code, 400)
+        self.assertEqual(self.submit(quiz, {"answers": {}, "pool": token[:-1] + "x"}).status_code, 400)
+        self.assertEqual(UserSubmission.objects.filter(quiz=quiz).count(), 0)
+
+    def test_quiz_without_a_pool_needs_no_token(self):
+        response = self.submit(self.quiz, {"answers": {str(self.question.id): str(self.answer.id)}})
+        self.assertEqual(response.json()["score"], 1)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz = Quiz.objects.create(title="Quiz")
+        self.users = [User.objects.create_user(f"user{i}") for i in range(5)]
+
+    def submit(self, user, score):
+        # Cache invalidation waits for the commit
+        with self.captureOnCommitCallbacks(execute=True):
+            record_submissions([(UserSubmission(quiz=self.quiz, user=user, user_name=user.username, score=score), [])])
+
+    def board(self):
+        return [(row["username"], row["score"]) for row in get_leaderboard(self.quiz.id)]
+
+    @mock.patch("quiz.leaderboard.LEADERBOARD_SIZE", 3)
+    def test_ties_keep_the_earlier_score(self):
+        for user in self.users[:3]:
+            self.submit(user, 5)
+        self.submit(self.users[3], 5)  # equal to last place: stays out
+        self.assertEqual(self.board(), [("user0", 5), ("user1", 5), ("user2", 5)])
+
+    @mock.patch("quiz.leaderboard.LEADERBOARD_SIZE", 3)
+    def test_board_is_trimmed_to_size(self):
+        for score, user in enumerate(self.users[:4], start=1):
+            self.submit(user, score)
+        self.assertEqual(self.board(), [("user3", 4), ("user2", 3), ("user1", 2)])
+        self.assertEqual(LeaderboardEntry.objects.filter(quiz=self.quiz).count(), 3)
+
+    def test_only_an_improvement_moves_a_user(self):
+        self.submit(self.users[0], 3)
+        self.submit(self.users[1], 4)
+        self.submit(self.users[0], 2)
+        self.assertEqual(self.board(), [("user1", 4), ("user0", 3)])
+        self.submit(self.users[0], 6)
+        self.assertEqual(self.board(), [("user0", 6), ("user1", 4)])
+
+    @mock.patch("quiz.leaderboard.LEADERBOARD_SIZE", 3)
+    def test_incremental_board_matches_rebuild(self):
+        for user, score in zip(self.users * 2, [2, 7, 7, 1, 4, 9, 3, 7, 5, 6]):
+            self.submit(user, score)
+        incremental = self.board()
+        rebuild_leaderboard(self.quiz.id)
+        self.assertEqual(self.board(), incremental)
+
+
+class ScoreHistogramTests(TestCase):
+    def test_percentile_counts_strictly_lower_scores(self):
+        histogram = {1: 2, 3: 5, 4: 3}
+        self.assertEqual(percentile_rank(histogram, 3), 20)
+        self.assertEqual(percentile_rank(histogram, 5), 100)
+        self.assertEqual(percentile_rank(histogram, 1), 0)
+        self.assertIsNone(percentile_rank({}, 3))
+
+    def test_recorded_buckets_match_rebuild(self):
+        quizzes = [Quiz.objects.create(title=f"Quiz {i}") for i in range(2)]
+        with self.captureOnCommitCallbacks(execute=True):
+            record_submissions([
+                (UserSubmission(quiz=quizzes[i % 2], user_name="anon", score=score), [])
+                for i, score in enumerate([3, 1, 3, 0, 2, 3, 1, 1])
+            ])
+        recorded = [get_histogram(quiz.id) for quiz in quizzes]
+        self.assertEqual(recorded[0], {3: 2, 2: 1, 1: 1})
+
+        ScoreBucket.objects.all().delete()
+        rebuild_histograms()
+        cache.clear()
+        self.assertEqual([get_histogram(quiz.id) for quiz in quizzes], recorded)
+
+
+class ItemAnalysisMathTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.answered = rng.random((60, 5)) < 0.9
+        self.correct = ((rng.random((60, 5)) < [0.2, 0.5, 0.7, 0.9, 0.5]) & self.answered).astype(np.int8)
+        self.correct[:, 4] = self.answered[:, 4]  # everyone who answered got it right
+
+    def test_derive_matches_a_naive_computation(self):
+        # Summed over two chunks, as refresh_item_analysis() does
+        sums = _chunk_sums(self.answered[:25], self.correct[:25]) + _chunk_sums(self.answered[25:], self.correct[25:])
+        difficulty, discrimination = _derive(sums)
+
+        totals = self.correct.sum(axis=1)
+        for col in range(4):
+            responders = self.answered[:, col]
+            item = self.correct[responders, col].astype(float)
+            rest = totals[responders] - item
+            self.assertAlmostEqual(difficulty[col], item.mean())
+            self.assertAlmostEqual(discrimination[col], np.corrcoef(item, rest)[0, 1])
+
+        # No variance in the item: difficulty 1, no correlation
+        self.assertEqual(difficulty[4], 1.0)
+        self.assertTrue(np.isnan(discrimination[4]))
+
+    def test_unanswered_question_has_no_statistics(self):
+        difficulty, discrimination = _derive(_chunk_sums(np.zeros((3, 1), dtype=bool), np.zeros((3, 1), dtype=np.int8)))
+        self.assertTrue(np.isnan(difficulty[0]))
+        self.assertTrue(np.isnan(discrimination[0]))
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.quiz = Quiz.objects.create(title="Quiz")
+        self.questions = [Question.objects.create(quiz=self.quiz, text=f"Q{i}") for i in range(2)]
+        q1, q2 = (q.id for q in self.questions)
+        record_submissions([
+            (UserSubmission(quiz=self.quiz, user_name="ann", score=2), [(q1, "4", True), (q2, "Paris", True)]),
+            (UserSubmission(quiz=self.quiz, user_name="@bob", score=0), [(q1, "=1+1", False)]),
+            (UserSubmission(quiz=self.quiz, user_name="cy", score=1), [(q2, "Paris", True)]),
+        ])
+        self.submissions = list(UserSubmission.objects.order_by("id"))
+
+    def test_csv_has_one_column_per_question_and_defuses_formulas(self):
+        rows = list(csv.reader(io.StringIO("".join(iter_csv(self.quiz, chunk_size=2)))))
+        self.assertEqual(rows[0], ["submission_id", "user_name", "score", "submitted_at", "Q1: Q0", "Q2: Q1"])
+        self.assertEqual([row[1:3] + row[4:] for row in rows[1:]], [
+            ["ann", "2", "4", "Paris"],
+            ["'@bob", "0", "'=1+1", ""],
+            ["cy", "1", "", "Paris"],
+        ])
+        self.assertEqual([int(row[0]) for row in rows[1:]], [s.id for s in self.submissions])
+
+    def test_columnar_round_trip(self):
+        question_ids, chunks = read_columnar(io.BytesIO(b"".join(iter_columnar(self.quiz, chunk_size=2))))
+        self.assertEqual(question_ids.tolist(), [q.id for q in self.questions])
+
+        ids, names, scores, submitted, correct = (np.concatenate(parts) for parts in zip(*chunks))
+        self.assertEqual(ids.tolist(), [s.id for s in self.submissions])
+        self.assertEqual(names.tolist(), ["ann", "@bob", "cy"])
+        self.assertEqual(scores.tolist(), [2, 0, 1])
+        self.assertEqual(submitted.tolist(), [int(s.submitted_at.timestamp() * 1_000_000) for s in self.submissions])
+        self.assertEqual(correct.tolist(), [[1, 1], [0, -1], [-1, 1]])
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "FTS5 index is SQLite only")
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.quiz = Quiz.objects.create(title="Plant Biology", description="Cells and leaves")
+
+    def found(self, text):
+        return [q.id for q in search_questions(text)]
+
+    def test_index_follows_question_edits(self):
+        question = Question.objects.create(quiz=self.quiz, text="Where does photosynthesis happen?")
+        self.assertEqual(self.found("photosynthesis"), [question.id])
+        self.assertEqual(search_quizzes("photosynth"), [self.quiz])
+
+        question.text = "What do mitochondria produce?"
+        question.save()
+        self.assertEqual(self.found("photosynthesis"), [])
+        self.assertEqual(self.found("mitochondria"), [question.id])
+
+        question.delete()
+        self.assertEqual(self.found("mitochondria"), [])
+
+    def test_index_follows_quiz_edits_and_deletes(self):
+        Question.objects.create(quiz=self.quiz, text="Name a chloroplast pigment")
+        self.quiz.title = "Botany"
+        self.quiz.save()
+        self.assertEqual(search_quizzes("botany"), [self.quiz])
+        self.assertEqual(search_quizzes("plant"), [])
+
+        self.quiz.delete()
+        self.assertEqual(search_quizzes("botany"), [])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM quiz_search_question")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_bulk_created_questions_are_indexed(self):
+        create_questions(self.quiz, [{"text": "Define osmosis", "answers": []}])
+        self.assertEqual([q.text for q in search_questions("osmosis")], ["Define osmosis"])
+
+        # The fixture reuses low primary keys: its rows replace ours in the index too
+        call_command("import_quizzes", "quiz/fixtures/quiz_data.json", stdout=io.StringIO())
+        self.assertEqual(search_questions("osmosis"), [])
+        fixture_question = Question.objects.exclude(quiz=self.quiz).first()
+        self.assertIn(fixture_question.id, self.found(fixture_question.text))
+
+
+class ItemAnalysisRefreshTests(TestCase):
+    def setUp(self):
+        self.quiz = Quiz.objects.create(title="Quiz")
+        self.questions = [Question.objects.create(quiz=self.quiz, text=f"Q{i}") for i in range(2)]
+
+    def submit(self, *answers, pk=None):
+        graded = [(q.id, text, ok) for q, (text, ok) in zip(self.questions, answers)]
+        submission = UserSubmission(pk=pk, quiz=self.quiz, user_name="anon", score=sum(ok for _, ok in answers))
+        record_submissions([(submission, graded)])
+
+    def test_wrong_answers_are_counted_per_question(self):
+        long_answer = "x" * 100_000
+        self.submit(("4", True), ("Lyon", False))
+        self.submit(("5", False), ("Lyon", False))
+        self.submit(("5", False), (long_answer, False))
+        self.submit(("4", True), ("Paris", True))
+
+        refresh_item_analysis(self.quiz)
+        rows = {row.question_id: row for row in QuestionAnalysis.objects.filter(quiz=self.quiz)}
+        self.assertEqual(rows[self.questions[0].id].distractors, {"5": 2})
+        self.assertEqual(rows[self.questions[1].id].distractors, {"Lyon": 2, long_answer: 1})
+        self.assertEqual((rows[self.questions[0].id].responses, rows[self.questions[0].id].difficulty), (4, 0.5))
+
+    def test_late_commit_below_the_mark_is_folded_in_once(self):
+        self.submit(("4", True), ("Paris", True), pk=10)
+        self.submit(("5", False), ("Lyon", False), pk=12)
+        self.assertEqual(refresh_item_analysis(self.quiz).submissions_count, 2)
+
+        # id 11 was assigned before 12 but committed after the refresh
+        self.submit(("4", True), ("Lyon", False), pk=11)
+        state = refresh_item_analysis(self.quiz)
+        self.assertEqual((state.submissions_count, state.last_submission_id), (3, 12))
+        self.assertEqual(refresh_item_analysis(self.quiz).submissions_count, 3)
+        self.assertEqual(QuestionAnalysis.objects.get(question=self.questions[0]).correct_count, 2)
+
+        # Outside the window, only ids above the mark are read
+        state.rescan_from = timezone.now()
+        state.save()
+        self.submit(("4", True), ("Paris", True), pk=13)
+        self.assertEqual(refresh_item_analysis(self.quiz).submissions_count, 4)
+        self.assertEqual(refresh_item_analysis(self.quiz, full=True).submissions_count, 4)
+
+
+# Derived tables created by a migration are seeded from existing submissions
+class MigrationSeedTests(TransactionTestCase):
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([("quiz", target)])
+        return executor.loader.project_state([("quiz", target)]).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes("quiz")[0][1])
+
+    def seed_submissions(self, apps):
+        User = apps.get_model("auth", "User")
+        Quiz = apps.get_model("quiz", "Quiz")
+        UserSubmission = apps.get_model("quiz", "UserSubmission")
+        users = [User.objects.create(username=f"user{i}") for i in range(3)]
+        quiz = Quiz.objects.create(title="Quiz")
+        for user, score in [(users[0], 3), (users[1], 5), (users[0], 5), (users[2], 1), (None, 4)]:
+            UserSubmission.objects.create(quiz=quiz, user=user, user_name="x", score=score)
+        return quiz, users
+
+    def test_leaderboard_is_seeded(self):
+        quiz, users = self.seed_submissions(self.migrate("0010_event_updated_at"))
+        apps = self.migrate("0011_leaderboardentry")
+        entries = apps.get_model("quiz", "LeaderboardEntry").objects.filter(quiz_id=quiz.id)
+        self.assertEqual(
+            list(entries.order_by("-best_score", "achieved_at").values_list("user_id", "best_score")),
+            [(users[1].id, 5), (users[0].id, 5), (users[2].id, 1)],
+        )
+
+    def test_score_histogram_is_seeded(self):
+        quiz, _ = self.seed_submissions(self.migrate("0011_leaderboardentry"))
+        apps = self.migrate("0012_scorebucket")
+        buckets = apps.get_model("quiz", "ScoreBucket").objects.filter(quiz_id=quiz.id)
+        self.assertEqual(dict(buckets.values_list("score", "count")), {1: 1, 3: 1, 4: 1, 5: 2})
+
+
+class QuestionPoolSizeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz = Quiz.objects.create(title="Pooled")
+        for i in range(10):
+            Question.objects.create(quiz=self.quiz, text=f"Q{i}", category="a" if i == 0 else "b")
+
+    def drawn(self, **pool):
+        Quiz.objects.filter(pk=self.quiz.pk).update(**pool)
+        quiz = Quiz.objects.get(pk=self.quiz.pk)
+        questions, _ = attempt_questions(get_answer_key(quiz))
+        return quiz, questions
+
+    def test_quota_shortfall_is_filled_from_other_questions(self):
+        quiz, questions = self.drawn(pool_quotas={"a": 4})
+        self.assertEqual((len(questions), quiz.attempt_size), (4, 4))
+        self.assertIn("a", [q["category"] for q in questions])
+
+    def test_attempt_size_matches_the_draw(self):
+        for pool in ({"pool_size": 3}, {"pool_size": 5, "pool_quotas": {"a": 2}},
+                     {"pool_size": 50}, {"pool_size": None, "pool_quotas": {}}):
+            quiz, questions = self.drawn(**pool)
+            self.assertEqual(len(questions), quiz.attempt_size, pool)
+
+
+@unittest.skipUnless(connection.vendor in ("sqlite", "postgresql"), "no planner statistics on this backend")
+class PlannerStatisticsTests(TestCase):
+    def test_analyze_tables_enables_estimated_counts(self):
+        quiz = Quiz.objects.create(title="Quiz")
+        UserSubmission.objects.bulk_create([UserSubmission(quiz=quiz, user_name="x", score=1) for _ in range(30)])
+        call_command("analyze_tables", stdout=io.StringIO())
+        self.assertEqual(estimated_row_count(UserSubmission), 30)
+
+
+class AdminQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        for i in range(3):
+            quiz = Quiz.objects.create(title=f"Quiz {i}")
+            for j in range(5):
+                question = Question.objects.create(quiz=quiz, text=f"Kinetic energy {i}.{j}")
+                Answer.objects.create(question=question, text="yes", is_correct=True)
+
+        cls.add_submissions(3)
+
+    @classmethod
+    def add_submissions(cls, n):
+        questions = list(Question.objects.values_list("id", flat=True)[:4])
+        record_submissions([
+            (UserSubmission(quiz=Quiz.objects.first(), user_name=f"student{i}", score=2),
+             [(question_id, "yes", True) for question_id in questions])
+            for i in range(n)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def queries(self, url, params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(captured), response
+
+    def test_question_autocomplete_joins_the_quiz(self):
+        params = {"app_label": "quiz", "model_name": "answer", "field_name": "question", "term": "kinetic"}
+        count, response = self.queries("/admin/autocomplete/", params)
+        self.assertEqual(len(response.json()["results"]), 15)
+        for i in range(3, 6):
+            quiz = Quiz.objects.create(title=f"Quiz {i}")
+            Question.objects.create(quiz=quiz, text="Kinetic energy again")
+        self.assertEqual(self.queries("/admin/autocomplete/", params)[0], count)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        urls = ["/admin/quiz/answer/", "/admin/quiz/useranswer/", "/admin/quiz/usersubmission/"]
+        before = [self.queries(url, {})[0] for url in urls]
+        self.add_submissions(10)
+        for i in range(10):
+            Answer.objects.create(question=Question.objects.last(), text=f"extra {i}", is_correct=False)
+        self.assertEqual([self.queries(url, {})[0] for url in urls], before)
+
+    @mock.patch("quiz.pagination.EstimatedCountPaginator.ESTIMATE_THRESHOLD", 10)
+    def test_large_changelists_use_the_estimate_instead_of_count(self):
+        call_command("analyze_tables", stdout=io.StringIO())
+        for url, table in [("/admin/quiz/answer/", "quiz_answer"), ("/admin/quiz/useranswer/", "quiz_useranswer")]:
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            counts = [q["sql"] for q in captured if "COUNT(*)" in q["sql"] and f'FROM "{table}"' in q["sql"]]
+            self.assertEqual(counts, [], url)
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "FTS5 index is SQLite only")
+    def test_changelist_search_uses_the_fts_index(self):
+        for url in ("/admin/quiz/question/", "/admin/quiz/quiz/"):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url, {"q": "kinetic" if "question" in url else "quiz"})
+            self.assertEqual(response.status_code, 200)
+            sql = [q["sql"] for q in captured if "quiz_search_" in q["sql"]]
+            self.assertTrue(sql, url)
+            self.assertFalse([q for q in sql if "LIKE" in q], url)
+        self.assertEqual(response.context["cl"].result_count, 3)
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.settings_override = override_settings(QUIZ_PROFILE_DIR=self.tmp, QUIZ_PROFILE_MAX_FILES=3)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.staff = User.objects.create_user("staff", is_staff=True)
+
+    def test_staff_profile_is_linked_from_the_response(self):
+        self.client.force_login(self.staff)
+        response = self.client.get("/login/", {"profile": "1"})
+        name = response["X-Profile-Id"]
+        self.assertEqual([p["name"] for p in list_profiles()], [name])
+
+        detail = self.client.get(f"/stats/profiles/{name}/")
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(detail.context["meta"]["reason"], "staff")
+        self.assertEqual(self.client.get("/stats/profiles/0-deadbeef/").status_code, 404)
+
+    @override_settings(QUIZ_PROFILE_SAMPLE_RATE=1.0)
+    def test_sampled_profiles_are_not_exposed(self):
+        response = self.client.get("/login/")
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual([p["reason"] for p in list_profiles()], ["sampled"])
+
+        student = User.objects.create_user("student")
+        self.client.force_login(student)
+        self.assertNotIn("X-Profile-Id", self.client.get("/login/", {"profile": "1"}))
+        self.assertEqual(self.client.get("/stats/profiles/").status_code, 302)
+
+    @override_settings(QUIZ_PROFILE_SAMPLE_RATE=1.0)
+    def test_ring_buffer_keeps_the_newest_profiles(self):
+        for _ in range(5):
+            self.client.get("/login/")
+        names = [p["name"] for p in list_profiles()]
+        self.assertEqual(len(names), 3)
+        self.assertEqual(sorted(os.listdir(self.tmp)), sorted(f"{n}.{ext}" for n in names for ext in ("json", "prof")))
+
+        self.client.force_login(self.staff)
+        listed = self.client.get("/stats/profiles/").context["profiles"]
+        self.assertEqual([p["name"] for p in listed], names)
+
+
+@override_settings(QUIZ_PERF_INSTRUMENTATION=True)
+class QueryTimingTests(TestCase):
+    def setUp(self):
+        rolling_stats.reset()
+        self.addCleanup(rolling_stats.reset)
+        self.staff = User.objects.create_user("staff", is_staff=True)
+        UserProfile.objects.create(user=self.staff, access_quiz=True)
+        self.client.force_login(self.staff)
+
+    def test_request_is_timed_and_logged(self):
+        with self.assertLogs("quiz.performance", "INFO") as logs:
+            response = self.client.get("/quizzes/")
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=[\d.]+$')
+
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((line["view"], line["method"], line["status"]), ("quiz_list", "GET", 200))
+        self.assertGreater(line["queries"], 0)
+        self.assertLessEqual(len(line["slowest"]), 5)
+
+    def test_stats_page_summarises_and_resets(self):
+        for _ in range(3):
+            self.client.get("/quizzes/")
+        rows = {row["view"]: row for row in self.client.get("/stats/performance/").context["rows"]}
+        self.assertEqual(rows["quiz_list"]["requests"], 3)
+        self.assertGreater(rows["quiz_list"]["mean_queries"], 0)
+
+        self.client.post("/stats/performance/")
+        self.assertEqual([row["view"] for row in rolling_stats.summary()], ["performance_stats"])
+
+    def test_stats_page_is_staff_only(self):
+        self.client.force_login(User.objects.create_user("student"))
+        self.assertEqual(self.client.get("/stats/performance/").status_code, 302)
+
+    @override_settings(QUIZ_PERF_INSTRUMENTATION=False)
+    def test_disabled_by_default(self):
+        self.assertNotIn("Server-Timing", self.client.get("/quizzes/"))
@@ -0,0 +1,111 @@
+import math
+import re
+import unicodedata
+
+from django.conf import settings
+
+# Typos forgiven per accepted answer, scaled by its length and capped here
+# (0 turns fuzzy matching off)
+MAX_EDITS = getattr(settings, "QUIZ_TEXT_MAX_EDITS", 2)
+# Default absolute tolerance for numeric answers; an accepted answer can set
+# its own with "9.81 ± 0.05" or "9.81 +/- 0.05"
+NUMERIC_TOLERANCE = getattr(settings, "QUIZ_TEXT_NUMERIC_TOLERANCE", 0.0)
+
+_TOLERANCE_RE = re.compile(r"^(.+?)\s*(?:±|\+/-|\+-)\s*(.+)$")
+
+
+# Canonical form of a typed answer: compatibility-decomposed, accents
+# stripped, case-folded, punctuation dropped and whitespace collapsed.
+def normalize_text_answer(text):
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(
+        " " if unicodedata.category(ch).startswith("P") else ch
+        for ch in text
+        if not unicodedata.combining(ch)
+    )
+    return " ".join(text.casefold().split())
+
+
+def _parse_number(text):
+    try:
+        value = float(unicodedata.normalize("NFKC", text).strip())
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _edit_limit(key):
+    if len(key) < 4:
+        return 0
+    return min(MAX_EDITS, 1 if len(key) < 9 else 2)
+
+
+# Precompute everything grading needs from a question's accepted answer
+# texts. The result is plain picklable data cached with the answer key.
+def compile_accepted(texts):
+    exact, fuzzy, numbers = set(), [], []
+    for text in texts:
+        match = _TOLERANCE_RE.match(text.strip())
+        value = _parse_number(match.group(1) if match else text)
+        tolerance = _parse_number(match.group(2)) if match else NUMERIC_TOLERANCE
+        if value is not None and tolerance is not None:
+            numbers.append((value, abs(tolerance)))
+            continue
+
+        key = normalize_text_answer(text)
+        exact.add(key)
+        limit = _edit_limit(key)
+        if limit:
+            fuzzy.append((key, limit))
+
+    return {"exact": frozenset(exact), "fuzzy": tuple(fuzzy), "numbers": tuple(numbers)}
+
+
+# Levenshtein distance restricted to a diagonal band of width 2*limit+1.
+# Gives up as soon as a whole row exceeds the limit.
+def within_edits(a, b, limit):
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > limit:
+        return False
+
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        ch = a[i - 1]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = min(
+                previous[j - 1] + (ch != b[j - 1]),
+                previous[j] + 1,
+                current[j - 1] + 1,
+            )
+            current[j] = cost if cost < over else over
+            if current[j] < row_min:
+                row_min = current[j]
+        if row_min > limit:
+            return False
+        previous = current
+
+    return previous[len(b)] <= limit
+
+
+# Grade a typed answer against compile_accepted() output: numeric match
+# first, then an exact set lookup, then bounded fuzzy comparison.
+def text_matches(compiled, text):
+    if compiled["numbers"]:
+        value = _parse_number(text or "")
+        if value is not None:
+            for target, tolerance in compiled["numbers"]:
+                if abs(value - target) <= tolerance + 1e-9 * max(1.0, abs(target)):
+                    return True
+
+    key = normalize_text_answer(text)
+    if not key:
+        return False
+    if key in compiled["exact"]:
+        return True
+    return any(within_edits(key, accepted, limit) for accepted, limit in compiled["fuzzy"])
@@ -13,16 +13,32 @@ urlpatterns = [
     
     # Quiz section
     path("quizzes/", views.quiz_list, name="quiz_list"),
+    path("quizzes/search/", views.quiz_search, name="quiz_search"),
     path("quiz/<int:quiz_id>/", views.quiz_attempt, name="quiz_attempt"),
+    path("quiz/<int:quiz_id>/leaderboard/", views.quiz_leaderboard, name="quiz_leaderboard"),
     path("result/<int:submission_id>/", views.quiz_result, name="quiz_result"),
+    path("result/pending/<str:token>/", views.quiz_result_pending, name="quiz_result_pending"),
     path("quizzes/create-quiz/", views.create_quiz, name="create_quiz"),
     path("quizzes/create-event/", views.create_event, name="create_event"),
 
+    # JSON API for lightweight clients
+    path("api/quiz/<int:quiz_id>/", views.api_quiz, name="api_quiz"),
+    path("api/quiz/<int:quiz_id>/submit/", views.api_quiz_submit, name="api_quiz_submit"),
+    path("api/quiz/<int:quiz_id>/distribution/", views.api_quiz_distribution, name="api_quiz_distribution"),
+
     # User quiz history and dashboard
     path("history/", views.quiz_history, name="quiz_history"),
+    path("history/json/", views.quiz_history_json, name="quiz_history_json"),
     path("dashboard/", views.quiz_dashboard, name="dashboard"),
+    path("dashboard/quiz/<int:quiz_id>/analysis/", views.quiz_analysis, name="quiz_analysis"),
+    path("dashboard/quiz/<int:quiz_id>/export/", views.export_submissions, name="export_submissions"),
 
     # Event section
     path("events/", views.event_list, name="event_list"),
     path("events/<int:event_id>/", views.event_detail, name="event_detail"),
+
+    # Staff diagnostics
+    path("stats/performance/", views.performance_stats, name="performance_stats"),
+    path("stats/profiles/", views.profile_list, name="profile_list"),
+    path("stats/profiles/<str:name>/", views.profile_detail, name="profile_detail"),
 ]
@@ -1,8 +1,7 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Prefetch
-from .models import Quiz, Question, Answer, UserSubmission, UserAnswer, Event, UserProfile
+from django.template.loader import render_to_string
+from .models import Quiz, UserSubmission, Event, UserProfile, UserQuizStats
 from .forms import QuizSubmissionForm
-from django.db.models import Count, Avg
 from django.contrib.auth import login, logout
 from .forms import RegisterForm
 from django.contrib import messages
@@ -13,9 +12,32 @@ from django.http import JsonResponse
 from django.db import transaction
 import json
 from django.contrib.auth.models import User
+from .access import load_access
+from .analytics import refresh_item_analysis
 from .decorators import access_required
+from .answer_key import get_answer_key
+from .api import attempt_json, quiz_json
+from .authoring import validate_questions, create_questions
+from .export import EXPORT_FORMATS, iter_export
+from .conditional import not_modified, page_etag, set_validators
+from .grading import grade_submission, record_submission
+from .histogram import distribution, get_histogram, percentile_rank
+from .instrumentation import rolling_stats
+from .leaderboard import get_leaderboard
+from .page_cache import bump_listing_generation, cached_fragment
+from .pagination import keyset_page
+from .pools import attempt_questions
+from .profiling import list_profiles, load_profile
+from .search import search_questions, search_quizzes
+from .writebehind import get_pending, submission_writer
 from django.contrib.admin.views.decorators import staff_member_required
-from django.http import HttpResponse
+from django.conf import settings
+from django.core.signing import BadSignature
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.dateformat import format as date_format
+from django.utils.timezone import localtime
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
 
 # Registration
 def register_view(request):
@@ -38,14 +60,14 @@ def login_view(request):
             user = form.get_user()
             login(request, user)
             
-            profile = user.userprofile
-            if profile.access_home:
+            access = load_access(user)
+            if access.home:
                 return redirect("home")
-            if profile.access_quiz:
+            if access.quiz:
                 return redirect("quiz_list")
-            if profile.access_event:
+            if access.event:
                 return redirect("event_list")
-            if not (profile.access_home or profile.access_quiz or profile.access_event):
+            if not access.any:
                 logout(request)
                 messages.error(request, "Your account does not have access to any pages. Contact admin.")
                 return HttpResponse("Access Denied Because You Didn't Check Any Pages", status=403)
@@ -66,29 +88,76 @@ def logout_view(request):
 # Home page view
 @access_required("access_home")
 def home(request):
-    quizzes = Quiz.objects.all()[:3]
-    events = Event.objects.all()[:3]
-    context = {"quizzes": quizzes, "events": events}
+    # Card lists are cached until a Quiz or Event changes
+    quiz_cards = cached_fragment("home_quizzes", request.access.mask, lambda: render_to_string(
+        "_home_quiz_cards.html", {"quizzes": Quiz.objects.filter(is_published=True)[:3]}
+    ))
+    event_cards = cached_fragment("home_events", request.access.mask, lambda: render_to_string(
+        "_home_event_cards.html", {"events": Event.objects.all()[:3]}
+    ))
+    context = {"quiz_cards": quiz_cards, "event_cards": event_cards}
     return render(request, "home.html", context)
 
 # QUIZ LIST
 @access_required("access_quiz")
 def quiz_list(request):
-    quizzes = Quiz.objects.all().order_by("-created_at")
-    return render(request, "quizzes/quiz_list.html", {"quizzes": quizzes})
+    quiz_cards = cached_fragment("quiz_list", request.access.mask, lambda: render_to_string(
+        "quizzes/_quiz_cards.html", {"quizzes": Quiz.objects.filter(is_published=True).order_by("-created_at")}
+    ))
+    return render(request, "quizzes/quiz_list.html", {"quiz_cards": quiz_cards})
+
+# QUIZ SEARCH (full-text, ranked by relevance)
+@access_required("access_quiz")
+def quiz_search(request):
+    query = request.GET.get("q", "").strip()
+    return render(request, "quizzes/quiz_search.html", {
+        "query": query,
+        "quizzes": search_quizzes(query) if query else [],
+        "questions": search_questions(query, limit=20) if query else [],
+    })
+
+# Save a graded attempt. Under exam load (QUIZ_WRITE_BEHIND) the write goes
+# to the background writer and a pending-result token is returned instead;
+# when its queue is full the attempt is written synchronously.
+def _save_attempt(request, quiz, score, graded, total_questions):
+    if getattr(settings, "QUIZ_WRITE_BEHIND", False):
+        token = submission_writer.submit(
+            UserSubmission(quiz=quiz, user=request.user, user_name=request.user.username, score=score),
+            graded,
+            total_questions=total_questions,
+        )
+        if token:
+            return None, token
+
+    submission = record_submission(
+        quiz=quiz,
+        user=request.user,
+        user_name=request.user.username,       # Keep for display if needed
+        score=score,
+        graded=graded,
+    )
+    return submission, None
 
 # QUIZ ATTEMPT PAGE
 @staff_member_required
 @login_required
 def quiz_attempt(request, quiz_id):
-    quiz = get_object_or_404(
-        Quiz.objects.prefetch_related(
-            Prefetch("questions", queryset=Question.objects.prefetch_related("answers"))
-        ),
-        id=quiz_id
-    )
-
-    questions = quiz.questions.all()
+    quiz = get_object_or_404(Quiz, id=quiz_id, is_published=True)
+
+    # Reloads of an unchanged quiz get a 304 before the question tree is touched
+    etag = page_etag(request, "quiz", quiz.pk, quiz.updated_at.isoformat())
+    response = not_modified(request, etag, quiz.updated_at, use_last_modified=False)
+    if response is not None:
+        return response
+
+    # Quiz structure comes from the cached answer key, not the database. With
+    # a question pool the GET draws a set and the POST grades that same set.
+    try:
+        questions, pool_token = attempt_questions(
+            get_answer_key(quiz), request.POST.get("pool", "") if request.method == "POST" else None
+        )
+    except BadSignature:
+        return HttpResponseBadRequest("Invalid question set")
     form = QuizSubmissionForm()
 
     if request.method == "POST":
@@ -97,50 +166,120 @@ def quiz_attempt(request, quiz_id):
 
             user_name = form.cleaned_data["user_name"]
 
-            # Create submission with the correct user
-            submission = UserSubmission.objects.create(
-                quiz=quiz,
-                user=request.user,    
-                user_name=request.user.username,       # Keep for display if needed
-                score=0,
-            )
+            # Grade everything in memory, then write the submission in bulk
+            score, graded = grade_submission(questions, request.POST)
 
-            total_score = 0
+            submission, token = _save_attempt(request, quiz, score, graded, len(questions))
+            if token:
+                return redirect("quiz_result_pending", token=token)
+            return redirect("quiz_result", submission_id=submission.id)
 
-            for q in questions:
-                field_name = f"question_{q.id}"
-                selected_answer = request.POST.get(field_name)
+    response = render(request, "quizzes/quiz_attempt.html", {
+        "quiz": quiz,
+        "questions": questions,
+        "pool_token": pool_token,
+        "form": form
+    })
+    if request.method == "GET":
+        set_validators(response, etag, quiz.updated_at)
+    return response
 
-                if q.question_type == "MCQ":
-                    ans_obj = Answer.objects.filter(id=selected_answer).first()
-                    is_correct = ans_obj.is_correct if ans_obj else False
-                    answer_text = ans_obj.text if ans_obj else "No answer"
-                else:
-                    user_text = selected_answer or ""
-                    correct_answer = Answer.objects.filter(question=q, is_correct=True).first()
-                    is_correct = (user_text.strip().lower() == correct_answer.text.lower())
-                    answer_text = user_text
 
-                UserAnswer.objects.create(
-                    submission=submission,
-                    question=q,
-                    answer=answer_text,
-                    is_correct=is_correct
-                )
+# QUIZ API: questions and answers without is_correct, pre-serialized
+@login_required
+@staff_member_required
+def api_quiz(request, quiz_id):
+    quiz = get_object_or_404(Quiz, id=quiz_id, is_published=True)
+
+    # A question pool is drawn per request, like the quiz page; the signed
+    # "pool" token in the body must come back with the submission
+    answer_key = get_answer_key(quiz)
+    if answer_key["pool"]:
+        response = HttpResponse(attempt_json(quiz, answer_key), content_type="application/json")
+        patch_cache_control(response, private=True, no_store=True)
+        return response
+
+    # The gzip and identity bodies differ byte for byte, so they get
+    # different strong ETags
+    gzipped = "gzip" in request.headers.get("Accept-Encoding", "")
+    version = f"quiz-{quiz.pk}-{int(quiz.updated_at.timestamp() * 1_000_000)}"
+    etag = quote_etag(f"{version}-gz" if gzipped else version)
+    response = not_modified(request, etag, quiz.updated_at)
+    if response is not None:
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
+
+    raw, compressed = quiz_json(quiz)
+    if gzipped:
+        response = HttpResponse(compressed, content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(raw, content_type="application/json")
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return set_validators(response, etag, quiz.updated_at)
 
-                if is_correct:
-                    total_score += 1
 
-            submission.score = total_score
-            submission.save()
+# QUIZ API: submit answers as {"answers": {"<question id>": "<answer id or text>"}},
+# plus "pool": "<token from GET>" for quizzes with a question pool
+@login_required
+@staff_member_required
+def api_quiz_submit(request, quiz_id):
+    if request.method != "POST":
+        return JsonResponse({"ok": False, "error": "POST required"}, status=405)
+
+    quiz = get_object_or_404(Quiz, id=quiz_id, is_published=True)
+    try:
+        body = json.loads(request.body.decode("utf-8"))
+        answers = body.get("answers", {})
+        data = {f"question_{qid}": str(value) for qid, value in answers.items()}
+    except (ValueError, AttributeError):
+        return JsonResponse({"ok": False, "error": "Invalid JSON"}, status=400)
+
+    # Same grading as the HTML form, over the questions that were served
+    try:
+        questions, _ = attempt_questions(get_answer_key(quiz), str(body.get("pool") or ""))
+    except BadSignature:
+        return JsonResponse({"ok": False, "error": "Invalid question set"}, status=400)
+    score, graded = grade_submission(questions, data)
+    submission, token = _save_attempt(request, quiz, score, graded, len(questions))
+
+    return JsonResponse({
+        "ok": True,
+        "submission_id": submission.id if submission else None,
+        "pending_token": token,
+        "score": score,
+        "total_questions": len(questions),
+        "percentile": percentile_rank(get_histogram(quiz.id), score),
+        "results": [
+            {"question_id": question_id, "is_correct": is_correct}
+            for question_id, _, is_correct in graded
+        ],
+    })
 
-            return redirect("quiz_result", submission_id=submission.id)
 
-    return render(request, "quizzes/quiz_attempt.html", {
-        "quiz": quiz,
-        "questions": questions,
-        "form": form
-    })
+# QUIZ API: score distribution, plus the percentile rank of ?score=N
+@login_required
+@staff_member_required
+def api_quiz_distribution(request, quiz_id):
+    quiz = get_object_or_404(Quiz, id=quiz_id, is_published=True)
+    histogram = get_histogram(quiz.id)
+
+    data = {
+        "quiz_id": quiz.id,
+        "total_questions": quiz.attempt_size,
+        "submissions": sum(histogram.values()),
+        "buckets": [
+            {"score": bar["score"], "count": bar["count"]}
+            for bar in distribution(histogram, quiz.attempt_size)
+        ],
+    }
+    if "score" in request.GET:
+        try:
+            score = int(request.GET["score"])
+        except ValueError:
+            return JsonResponse({"ok": False, "error": "Invalid score"}, status=400)
+        data["percentile"] = percentile_rank(histogram, score)
+    return JsonResponse(data)
 
 
 # QUIZ RESULT
@@ -151,61 +290,137 @@ def quiz_result(request, submission_id):
         UserSubmission.objects.select_related("quiz"),
         id=submission_id
     )
+    user_answers = submission.user_answers.select_related("question").order_by("question_id")
+    histogram = get_histogram(submission.quiz_id)
 
     return render(request, "quizzes/quiz_result.html", {
         "submission": submission,
+        "user_answers": user_answers,
+        "percentile": percentile_rank(histogram, submission.score),
+        "distribution": distribution(histogram, submission.quiz.attempt_size),
     })
 
-# QUIZ HISTORY
-from django.db.models import Count, Avg
 
+# QUIZ LEADERBOARD
 @login_required
 @staff_member_required
-def quiz_history(request):
-    submissions = (
-        UserSubmission.objects
-        .filter(user=request.user)
-        .select_related("quiz")
-        .order_by("-submitted_at")
+def quiz_leaderboard(request, quiz_id):
+    quiz = get_object_or_404(Quiz, id=quiz_id, is_published=True)
+
+    return render(request, "quizzes/quiz_leaderboard.html", {
+        "quiz": quiz,
+        "entries": get_leaderboard(quiz.id),
+    })
+
+
+# QUIZ RESULT (queued by the write-behind writer, not saved yet)
+@login_required
+@staff_member_required
+def quiz_result_pending(request, token):
+    pending = get_pending(token)
+    if pending is None or pending["user_id"] != request.user.id:
+        raise Http404("Result not found")
+
+    if pending["submission_id"]:
+        return redirect("quiz_result", submission_id=pending["submission_id"])
+
+    return render(request, "quizzes/quiz_result_pending.html", {
+        "pending": pending,
+    })
+
+# QUIZ HISTORY
+HISTORY_PAGE_SIZE = 20
+
+def _history_page(request):
+    submissions, next_cursor = keyset_page(
+        UserSubmission.objects.filter(user=request.user).select_related("quiz", "user"),
+        cursor=request.GET.get("cursor"),
+        page_size=HISTORY_PAGE_SIZE,
     )
 
+    # Precomputed per-quiz totals for the quizzes on this page only
     quiz_stats = (
-        Quiz.objects
-        .filter(submissions__user=request.user)
-        .annotate(
-            attempts_count=Count("submissions"),
-            average_score=Avg("submissions__score"),
-            total_questions=Count("questions", distinct=True)
-        )
+        UserQuizStats.objects
+        .filter(user=request.user, quiz_id__in={s.quiz_id for s in submissions})
+        .select_related("quiz")
     )
 
     # Calculate avg_percentage per quiz
     stats_map = {}
-    for q in quiz_stats:
+    for stats in quiz_stats:
         avg_percentage = 0
-        if q.total_questions > 0 and q.average_score is not None:
-            avg_percentage = (q.average_score / q.total_questions) * 100
-        q.avg_percentage = avg_percentage
-        stats_map[q.id] = q
+        if stats.quiz.attempt_size > 0:
+            avg_percentage = (stats.average_score / stats.quiz.attempt_size) * 100
+        stats.avg_percentage = avg_percentage
+        stats_map[stats.quiz_id] = stats
+
+    return submissions, stats_map, next_cursor
+
+
+@login_required
+@staff_member_required
+def quiz_history(request):
+    try:
+        submissions, stats_map, next_cursor = _history_page(request)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor")
 
     return render(request, "quizzes/quiz_history.html", {
         "submissions": submissions,
         "stats_map": stats_map,
+        "next_cursor": next_cursor,
     })
 
+
+# QUIZ HISTORY (JSON, for infinite scroll)
+@login_required
+@staff_member_required
+def quiz_history_json(request):
+    try:
+        submissions, stats_map, next_cursor = _history_page(request)
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "Invalid cursor"}, status=400)
+
+    results = []
+    for s in submissions:
+        stats = stats_map.get(s.quiz_id)
+        results.append({
+            "id": s.id,
+            "quiz_id": s.quiz_id,
+            "quiz_title": s.quiz.title,
+            "username": request.user.username,
+            "score": s.score,
+            "total_questions": s.quiz.attempt_size,
+            "submitted_at": s.submitted_at.isoformat(),
+            "submitted_display": date_format(localtime(s.submitted_at), "M. d, Y, P"),
+            "attempts_count": stats.attempts_count if stats else 0,
+            "avg_percentage": round(stats.avg_percentage, 2) if stats else 0,
+        })
+
+    return JsonResponse({"ok": True, "results": results, "next_cursor": next_cursor})
+
     
 # EVENTS LIST
 @access_required("access_event")
 def event_list(request):
-    events = Event.objects.all().order_by("date")
-    return render(request, "events/event_list.html", {"events": events})
+    event_cards = cached_fragment("event_list", request.access.mask, lambda: render_to_string(
+        "events/_event_cards.html", {"events": Event.objects.all().order_by("date")}
+    ))
+    return render(request, "events/event_list.html", {"event_cards": event_cards})
 
 # EVENT DETAIL
 @login_required
 @staff_member_required
 def event_detail(request, event_id):
     event = get_object_or_404(Event, id=event_id)
-    return render(request, "events/event_detail.html", {"event": event})
+
+    etag = page_etag(request, "event", event.pk, event.updated_at.isoformat())
+    response = not_modified(request, etag, event.updated_at)
+    if response is not None:
+        return response
+
+    response = render(request, "events/event_detail.html", {"event": event})
+    return set_validators(response, etag, event.updated_at)
 
 @login_required
 @staff_member_required
@@ -223,6 +438,38 @@ def quiz_dashboard(request):
     return render(request, "quizzes/dashboard.html", context)
 
 
+# ITEM ANALYSIS for the quiz creator (folds in new submissions first)
+@login_required
+@staff_member_required
+def quiz_analysis(request, quiz_id):
+    quiz = get_object_or_404(Quiz, id=quiz_id, created_by=request.user)
+    state = refresh_item_analysis(quiz)
+    questions = quiz.questions.select_related("analysis").order_by("id")
+
+    return render(request, "quizzes/quiz_analysis.html", {
+        "quiz": quiz,
+        "state": state,
+        "questions": questions,
+    })
+
+
+# SUBMISSION EXPORT: streamed wide CSV or columnar .npy for the quiz creator
+@login_required
+@staff_member_required
+def export_submissions(request, quiz_id):
+    quizzes = Quiz.objects.all() if request.user.is_superuser else Quiz.objects.filter(created_by=request.user)
+    quiz = get_object_or_404(quizzes, id=quiz_id)
+
+    export_format = request.GET.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("Unknown export format")
+    content_type, extension = EXPORT_FORMATS[export_format]
+
+    response = StreamingHttpResponse(iter_export(quiz, export_format), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="quiz-{quiz.id}-submissions.{extension}"'
+    return response
+
+
 @login_required
 @staff_member_required
 def create_quiz(request):
@@ -232,9 +479,37 @@ def create_quiz(request):
         except:
             return JsonResponse({"ok": False, "error": "Invalid JSON"}, status=400)
 
+        questions = data.get("questions", [])
+        quiz_id = data.get("quiz_id")
+        # Chunked uploads send "final": false on every request but the last
+        final = data.get("final", True) is not False
+
+        # Large quizzes are uploaded in chunks: the first request creates an
+        # unpublished draft, later ones append questions to it by quiz_id and
+        # the final one publishes it. A rejected chunk discards the draft.
+        if quiz_id:
+            quiz = get_object_or_404(Quiz, id=quiz_id, created_by=request.user, is_published=False)
+            try:
+                offset = int(data.get("offset", 0))
+            except (TypeError, ValueError):
+                return JsonResponse({"ok": False, "error": "Invalid offset"}, status=400)
+
+            errors = validate_questions(questions, start=offset + 1)
+            if errors:
+                quiz.delete()
+                return JsonResponse({"ok": False, "errors": errors}, status=400)
+
+            with transaction.atomic():
+                create_questions(quiz, questions)
+                if final:
+                    Quiz.objects.filter(pk=quiz.pk).update(is_published=True)
+            if final:
+                bump_listing_generation()
+
+            return JsonResponse({"ok": True, "quiz_id": quiz.id, "redirect": "/dashboard/"})
+
         title = data.get("title", "").strip()
         description = data.get("description", "").strip()
-        questions = data.get("questions", [])
 
         errors = []
 
@@ -243,17 +518,7 @@ def create_quiz(request):
         if len(questions) == 0:
             errors.append("You must add at least one question.")
 
-        for i, q in enumerate(questions, start=1):
-            if not q.get("text", "").strip():
-                errors.append(f"Question {i} text is required.")
-
-            ans = q.get("answers", [])
-            if len(ans) < 2:
-                errors.append(f"Question {i} must have at least 2 answers.")
-
-            correct_count = sum(a.get("is_correct") for a in ans)
-            if correct_count != 1:
-                errors.append(f"Question {i} must have exactly 1 correct answer.")
+        errors += validate_questions(questions)
 
         if errors:
             return JsonResponse({"ok": False, "errors": errors}, status=400)
@@ -264,22 +529,11 @@ def create_quiz(request):
                 title=title,
                 description=description,
                 created_by=request.user,
+                is_published=final,
             )
+            create_questions(quiz, questions)
 
-            for q in questions:
-                question = Question.objects.create(
-                    quiz=quiz,
-                    text=q["text"],
-                    question_type="MCQ"
-                )
-                for a in q["answers"]:
-                    Answer.objects.create(
-                        question=question,
-                        text=a["text"],
-                        is_correct=a["is_correct"]
-                    )
-
-        return JsonResponse({"ok": True, "redirect": "/dashboard/"})
+        return JsonResponse({"ok": True, "quiz_id": quiz.id, "redirect": "/dashboard/"})
 
     return render(request, "quizzes/create_quiz.html")
 
@@ -329,3 +583,40 @@ def add_user(request):
     
     return render(request, "users/add_user.html", {"form": form})
 
+
+
+# REQUEST PERFORMANCE STATS (from QueryTimingMiddleware)
+@login_required
+@staff_member_required
+def performance_stats(request):
+    if request.method == "POST":
+        rolling_stats.reset()
+        return redirect("performance_stats")
+
+    return render(request, "stats/performance.html", {
+        "rows": rolling_stats.summary(),
+        "enabled": getattr(settings, "QUIZ_PERF_INSTRUMENTATION", False),
+    })
+
+
+# REQUEST PROFILES (from ProfilingMiddleware)
+@login_required
+@staff_member_required
+def profile_list(request):
+    return render(request, "stats/profile_list.html", {
+        "profiles": list_profiles(),
+    })
+
+
+@login_required
+@staff_member_required
+def profile_detail(request, name):
+    profile = load_profile(name)
+    if profile is None:
+        raise Http404("Profile not found")
+
+    meta, rows = profile
+    return render(request, "stats/profile_detail.html", {
+        "meta": meta,
+        "rows": rows,
+    })
@@ -0,0 +1,136 @@
+import atexit
+import logging
+import queue
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .grading import record_submissions
+from .models import UserSubmission
+
+logger = logging.getLogger(__name__)
+
+# Graded-but-unsaved submissions are tracked in the cache under a token so the
+# result page can show the score before the row exists. Use a shared cache
+# backend (Redis, Memcached, database) when running several worker processes.
+PENDING_TIMEOUT = 60 * 60
+
+
+def pending_cache_key(token):
+    return f"quiz:pending_submission:{token}"
+
+
+def get_pending(token):
+    return cache.get(pending_cache_key(token))
+
+
+# Queue drained by one background thread that writes submissions in batches,
+# so a burst of POSTs turns into a few short write transactions instead of
+# one per student.
+class SubmissionWriter:
+    def __init__(self, max_pending=1000, batch_size=100, flush_interval=0.5):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread = None
+        self._exit_hook = False
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="quiz-submission-writer", daemon=True)
+                self._thread.start()
+            if not self._exit_hook:
+                atexit.register(self.flush)
+                self._exit_hook = True
+
+    # Queue a graded submission. Returns a token for the pending result page,
+    # or None when the queue is full so the caller writes synchronously
+    # (which is the back-pressure: the request waits for the database).
+    def submit(self, submission, graded, total_questions):
+        self._ensure_started()
+        token = uuid.uuid4().hex
+        cache.set(pending_cache_key(token), {
+            "quiz_id": submission.quiz_id,
+            "user_id": submission.user_id,
+            "user_name": submission.user_name,
+            "score": submission.score,
+            "total_questions": total_questions,
+            "submission_id": None,
+            "failed": False,
+        }, PENDING_TIMEOUT)
+
+        try:
+            self.queue.put_nowait((token, submission, graded))
+        except queue.Full:
+            cache.delete(pending_cache_key(token))
+            return None
+        return token
+
+    def _take_batch(self, block=True):
+        batch = []
+        try:
+            batch.append(self.queue.get(block=block, timeout=self.flush_interval if block else None))
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        with self._write_lock:
+            close_old_connections()
+            try:
+                saved = record_submissions([(submission, graded) for _, submission, graded in batch])
+            except Exception:
+                logger.exception("Batched write of %d submissions failed; retrying one by one", len(batch))
+                saved = []
+                for item in batch:
+                    item[1].pk = None  # discard ids from the rolled-back insert
+                    try:
+                        saved.extend(record_submissions([(item[1], item[2])]))
+                    except Exception:
+                        logger.exception("Could not save queued submission %s", item[0])
+                        saved.append(None)
+            finally:
+                close_old_connections()
+
+            for (token, _, _), submission in zip(batch, saved):
+                self._mark_done(token, submission)
+
+    def _mark_done(self, token, submission):
+        key = pending_cache_key(token)
+        pending = cache.get(key)
+        if pending is None:
+            return
+        if isinstance(submission, UserSubmission):
+            pending["submission_id"] = submission.id
+        else:
+            pending["failed"] = True
+        cache.set(key, pending, PENDING_TIMEOUT)
+
+    # Write everything still queued from the calling thread (used at exit)
+    def flush(self):
+        while True:
+            batch = self._take_batch(block=False)
+            if not batch:
+                return
+            self._write(batch)
+
+
+submission_writer = SubmissionWriter(
+    max_pending=getattr(settings, "QUIZ_WRITE_BEHIND_MAX_PENDING", 1000),
+    batch_size=getattr(settings, "QUIZ_WRITE_BEHIND_BATCH_SIZE", 100),
+    flush_interval=getattr(settings, "QUIZ_WRITE_BEHIND_FLUSH_INTERVAL", 0.5),
+)
@@ -47,11 +47,14 @@ TAILWIND_APP_NAME = 'theme'
 INTERNAL_IPS = ['127.0.0.1']
 
 MIDDLEWARE = [
+    'quiz.middleware.QueryTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'quiz.middleware.AccessMiddleware',
+    'quiz.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -135,3 +138,36 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Write-behind submission queue for exam spikes: graded submissions are queued
+# and saved in batches by a background thread. Needs a cache shared by all
+# worker processes when enabled.
+QUIZ_WRITE_BEHIND = False
+QUIZ_WRITE_BEHIND_MAX_PENDING = 1000
+QUIZ_WRITE_BEHIND_BATCH_SIZE = 100
+QUIZ_WRITE_BEHIND_FLUSH_INTERVAL = 0.5
+
+# Per-request SQL/template timing (Server-Timing header, "quiz.performance"
+# log lines and the staff page at /stats/performance/)
+QUIZ_PERF_INSTRUMENTATION = False
+
+# Request profiling: staff can add ?profile=1 to any URL; a non-zero sample
+# rate also profiles that fraction of all requests. Profiles are kept in a
+# ring buffer of QUIZ_PROFILE_MAX_FILES files (default dir: system temp).
+QUIZ_PROFILE_SAMPLE_RATE = 0.0
+QUIZ_PROFILE_DIR = None
+QUIZ_PROFILE_MAX_FILES = 50
+
+# Number of places kept on each quiz leaderboard (best score per user)
+QUIZ_LEADERBOARD_SIZE = 10
+
+# TEXT question grading: every correct Answer is an accepted spelling, up to
+# QUIZ_TEXT_MAX_EDITS typos are forgiven on longer answers, and numeric
+# answers match within QUIZ_TEXT_NUMERIC_TOLERANCE (or "value ± tolerance")
+QUIZ_TEXT_MAX_EDITS = 2
+QUIZ_TEXT_NUMERIC_TOLERANCE = 0.0
+
+# Item analysis re-reads submissions this many seconds old on each refresh,
+# so one whose id was assigned before a refresh but committed after it is
+# still counted (once). Keep it above the longest submission transaction.
+QUIZ_ANALYSIS_LATE_COMMIT_WINDOW = 300